@@ -2,8 +2,11 @@ import pandas as pd
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
 
+# Number of discrete inventory levels used by encode_state
+INVENTORY_BUCKETS = 100
+
 class SupplyChainEnvironment:
-    def __init__(self, data_file, distances_file, max_days=180, max_inventory=500):
+    def __init__(self, data_file, distances_file, max_days=180, max_inventory=500, precompiled=False, seed=None, discretizer=None):
         self.data = pd.read_csv(data_file)
         self.distances = pd.read_csv(distances_file)
 
@@ -24,17 +27,55 @@ class SupplyChainEnvironment:
         self.state = None
         self.last_invenetory = 0
 
+        # Optional StateDiscretizer for multi-feature states; None keeps the day/inventory grid
+        self.discretizer = discretizer.fit(self.data, max_days) if discretizer is not None else None
+
+        # Per-environment RNG; falls back to the global np.random stream when unseeded
+        self.precompiled = precompiled
+        self.seed(seed)
+
+        # Precompiled mode: copy the per-day columns into contiguous arrays once so
+        # step/reset never touch pandas
+        if self.precompiled:
+            self.demand_array = np.ascontiguousarray(self.data["demand_normalized"].to_numpy(dtype=np.float64))
+            self.transport_cost_array = np.ascontiguousarray(self.data["transport_cost_normalized"].to_numpy(dtype=np.float64))
+            self.inventory_array = np.ascontiguousarray(self.data["inventory_normalized"].to_numpy(dtype=np.float64))
+            self.inventory_level = float(self.inventory_array[0])
+
+    def seed(self, seed=None):
+        """
+        Reseeds the demand-noise RNG. Precompiled environments always get their own RandomState.
+        """
+        if seed is None and not self.precompiled:
+            self.rng = np.random
+        else:
+            self.rng = np.random.RandomState(seed)
+
     def encode_state(self, inventory_level, day):
         """
         Encodes the state as a single integer index.
         """
-        inventory_index = min(max(int(inventory_level * 100), 0), 99)  # Scale to discrete range [0, 99]
+        if self.discretizer is not None:
+            return self.discretizer.encode(inventory_level, day)
+        inventory_index = min(max(int(inventory_level * INVENTORY_BUCKETS), 0), INVENTORY_BUCKETS - 1)  # Scale to discrete range [0, 99]
         day_index = min(max(day, 0), self.max_days - 1)
-        return day_index * 100 + inventory_index
+        return day_index * INVENTORY_BUCKETS + inventory_index
+
+    @property
+    def state_size(self):
+        """
+        Number of distinct states encode_state can emit.
+        """
+        if self.discretizer is not None:
+            return self.discretizer.num_keys
+        return self.max_days * INVENTORY_BUCKETS
 
     def reset(self):
         self.current_day = 0
-        self.inventory_level = self.data.iloc[0]["inventory_normalized"]  # Use normalized inventory
+        if self.precompiled:
+            self.inventory_level = float(self.inventory_array[0])
+        else:
+            self.inventory_level = self.data.iloc[0]["inventory_normalized"]  # Use normalized inventory
         self.state = self.encode_state(self.inventory_level, self.current_day)
         return self.state
     
@@ -42,29 +83,19 @@ class SupplyChainEnvironment:
         return self.inventory_level
     
     def step(self, action):
+        if self.precompiled:
+            return self._step_precompiled(action)
+
         # Adjust inventory based on action
         self.inventory_level += action/7  # Reduced scaling for smoother adjustments
         self.inventory_level = min(max(self.inventory_level, 0), self.max_inventory)  # Cap inventory
 
         # Current demand and transport cost
-        demand_normalized = self.data.iloc[self.current_day]["demand_normalized"] * np.random.uniform(0.95, 1.05)
+        demand_normalized = self.data.iloc[self.current_day]["demand_normalized"] * self.rng.uniform(0.95, 1.05)
         transport_cost_normalized = self.data.iloc[self.current_day]["transport_cost_normalized"]
 
         # Reward calculation
-        reward = 0
-        if self.inventory_level < 0.5 and demand_normalized > 0.5:
-            # Stockout penalty proportional to shortfall
-            stock_penalty = -1000
-            reward = stock_penalty 
-        elif self.inventory_level> 0.5 and demand_normalized < 0.5 :
-            stock_penalty = -50
-            overstock_penalty = -50
-            reward = stock_penalty + overstock_penalty
-        elif self.inventory_level < 0.5 and demand_normalized < 0.5 and demand_normalized < self.inventory_level:
-            stock_penalty = 100
-            overstock_penalty = 0
-            reward = stock_penalty + overstock_penalty
-
+        reward = self.compute_reward(self.inventory_level, demand_normalized)
 
         # Update inventory after demand
         self.inventory_level = max(self.inventory_level - demand_normalized, 0)
@@ -82,5 +113,180 @@ class SupplyChainEnvironment:
         self.state = self.encode_state(self.inventory_level, self.current_day)
         return self.state, reward, done
     
+    def _step_precompiled(self, action):
+        """
+        Same transition as step, reading only the precompiled arrays and Python scalars.
+        """
+        inventory_level = min(max(self.inventory_level + action/7, 0), self.max_inventory)
+        demand_normalized = self.demand_array[self.current_day] * self.rng.uniform(0.95, 1.05)
+
+        reward = self.compute_reward(inventory_level, demand_normalized)
+
+        inventory_level = max(inventory_level - demand_normalized, 0)
+        self.last_invenetory = inventory_level
+
+        self.current_day += 1
+        done = self.current_day >= self.max_days
+        if not done:
+            inventory_level = float(self.inventory_array[self.current_day])
+
+        self.inventory_level = inventory_level
+        self.state = self.encode_state(inventory_level, self.current_day)
+        return self.state, reward, done
+
+    def episode_states(self):
+        """
+        States visited on each day of an episode. Each day starts from the data's inventory
+        level regardless of earlier actions, so these do not depend on the policy.
+        """
+        if self.discretizer is not None:
+            return self.discretizer.encode_many(self.inventory_array[:self.max_days], np.arange(self.max_days))
+        inventory_index = np.clip((self.inventory_array[:self.max_days] * INVENTORY_BUCKETS).astype(np.int64), 0, INVENTORY_BUCKETS - 1)
+        return np.arange(self.max_days) * INVENTORY_BUCKETS + inventory_index
+
+    def simulate_days(self, actions, noise):
+        """
+        Vectorized day transitions for actions and demand noise of shape (..., max_days),
+        e.g. one row per rollout. Returns (rewards, inventory_after) of the same shape.
+        """
+        inventory_levels = np.clip(self.inventory_array[:self.max_days] + actions / 7, 0, self.max_inventory)
+        demand_normalized = self.demand_array[:self.max_days] * noise
+        rewards = BatchSupplyChainEnvironment.compute_rewards(inventory_levels, demand_normalized)
+        return rewards, np.maximum(inventory_levels - demand_normalized, 0)
+
+    def rollout(self, policy_actions):
+        """
+        Runs a whole episode of a deterministic policy (one action per state, e.g.
+        GreedyPolicy.actions) in a single vectorized pass. Noise is drawn in the same order
+        as step, giving the same trajectory as stepping. Returns a dict of per-day arrays
+        and leaves the environment in its terminal state.
+        """
+        if not self.precompiled:
+            raise ValueError("rollout requires a precompiled environment")
+
+        states = self.episode_states()
+        actions = np.asarray(policy_actions)[states].astype(np.int64)
+        rewards, inventory_after = self.simulate_days(actions, self.rng.uniform(0.95, 1.05, size=self.max_days))
+
+        # Next-day inventory; after the last day the post-demand level is kept
+        next_inventory = np.append(self.inventory_array[1:self.max_days], inventory_after[-1])
+
+        self.current_day = self.max_days
+        self.inventory_level = float(next_inventory[-1])
+        self.last_invenetory = float(inventory_after[-1])
+        self.state = self.encode_state(self.inventory_level, self.current_day)
+        return {
+            "day": np.arange(1, self.max_days + 1),
+            "state": states,
+            "action": actions,
+            "inventory_before": self.inventory_array[:self.max_days],
+            "inventory_after": inventory_after,
+            "next_inventory": next_inventory,
+            "reward": rewards,
+        }
+
+    @staticmethod
+    def compute_reward(inventory_level, demand_normalized):
+        """
+        Threshold-based reward for the inventory held against the day's demand.
+        """
+        if inventory_level < 0.5 and demand_normalized > 0.5:
+            # Stockout penalty proportional to shortfall
+            return -1000
+        elif inventory_level > 0.5 and demand_normalized < 0.5:
+            # Stock penalty (-50) plus overstock penalty (-50)
+            return -100
+        elif inventory_level < 0.5 and demand_normalized < 0.5 and demand_normalized < inventory_level:
+            return 100
+        return 0
+
     def last_inve(self):
         return self.last_invenetory
+
+
+class BatchSupplyChainEnvironment(SupplyChainEnvironment):
+    """
+    N independent copies of SupplyChainEnvironment stepped together as NumPy arrays.
+    Each copy has its own inventory level, day counter and demand noise draw.
+    """
+    def __init__(self, data_file, distances_file, num_envs, max_days=180, max_inventory=500, seed=None, discretizer=None):
+        super().__init__(
+            data_file, distances_file, max_days=max_days, max_inventory=max_inventory, precompiled=True, seed=seed, discretizer=discretizer
+        )
+        self.num_envs = num_envs
+        self.inventory_levels = np.zeros(num_envs)
+        self.last_inventories = np.zeros(num_envs)
+        self.current_days = np.zeros(num_envs, dtype=np.int64)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self.states = np.zeros(num_envs, dtype=np.int64)
+
+    def encode_states(self, inventory_levels, days):
+        """
+        Vectorized encode_state over arrays of inventory levels and days.
+        """
+        if self.discretizer is not None:
+            return self.discretizer.encode_many(inventory_levels, days)
+        inventory_index = np.clip((inventory_levels * INVENTORY_BUCKETS).astype(np.int64), 0, INVENTORY_BUCKETS - 1)
+        day_index = np.clip(days, 0, self.max_days - 1)
+        return day_index * INVENTORY_BUCKETS + inventory_index
+
+    def reset(self, indices=None):
+        """
+        Resets all copies, or only those selected by an index array / boolean mask.
+        """
+        if indices is None:
+            indices = slice(None)
+        self.current_days[indices] = 0
+        self.inventory_levels[indices] = self.inventory_array[0]
+        self.dones[indices] = False
+        self.states = self.encode_states(self.inventory_levels, self.current_days)
+        return self.states.copy()
+
+    def step(self, actions):
+        # Copies that already finished their episode stay frozen with zero reward
+        active = ~self.dones
+        actions = np.broadcast_to(np.asarray(actions, dtype=np.float64), (self.num_envs,))
+
+        # Adjust inventory based on action
+        inventory_levels = np.clip(self.inventory_levels + actions / 7, 0, self.max_inventory)
+
+        # Current demand, one noise draw per copy
+        days = np.minimum(self.current_days, self.max_days - 1)
+        demand_normalized = self.demand_array[days] * self.rng.uniform(0.95, 1.05, size=self.num_envs)
+
+        rewards = np.where(active, self.compute_rewards(inventory_levels, demand_normalized), 0)
+
+        # Update inventory after demand
+        inventory_levels = np.maximum(inventory_levels - demand_normalized, 0)
+        self.last_inventories = np.where(active, inventory_levels, self.last_inventories)
+
+        # Move to the next day
+        self.current_days = np.where(active, self.current_days + 1, self.current_days)
+        self.dones = self.current_days >= self.max_days
+        next_days = np.minimum(self.current_days, self.max_days - 1)
+        inventory_levels = np.where(self.dones, inventory_levels, self.inventory_array[next_days])
+        self.inventory_levels = np.where(active, inventory_levels, self.inventory_levels)
+
+        self.states = self.encode_states(self.inventory_levels, self.current_days)
+        return self.states.copy(), rewards, self.dones.copy()
+
+    @staticmethod
+    def compute_rewards(inventory_levels, demand_normalized):
+        """
+        Vectorized compute_reward; conditions are checked in the same order as the scalar version.
+        """
+        return np.select(
+            [
+                (inventory_levels < 0.5) & (demand_normalized > 0.5),
+                (inventory_levels > 0.5) & (demand_normalized < 0.5),
+                (inventory_levels < 0.5) & (demand_normalized < 0.5) & (demand_normalized < inventory_levels),
+            ],
+            [-1000, -100, 100],
+            default=0,
+        )
+
+    def current_inve(self):
+        return self.inventory_levels
+
+    def last_inve(self):
+        return self.last_inventories
@@ -0,0 +1,91 @@
+import numpy as np
+
+# (feature, bins) pairs. "day" is the episode day and "inventory" the current inventory
+# level; any other name is a column of the processed data, read for the current day.
+# bins is None (one bin per day, "day" only), an int (that many equal-width bins over
+# [0, 1], as encode_state does for inventory) or a list of bin edges for np.digitize.
+DEFAULT_FEATURES = [
+    ("day", None),
+    ("inventory", 100),
+    ("lead_time", [3, 5, 10]),
+    ("transport_cost", [0.01, 0.05, 0.2]),
+    ("shortage", [1e-9]),
+    ("TotalNormalizedPitStops", [1e-9, 5]),
+]
+
+class StateDiscretizer:
+    """
+    Multi-feature state encoding. Each feature is discretized on its own and the bin
+    indices are combined into one mixed-radix integer key (first feature most
+    significant). The key space is the product of the bin counts, so a rich encoding is
+    meant for a sparse Q-store that only holds visited keys.
+
+    All features except "inventory" are fixed per day, so fit() folds them into one key
+    offset per day and encode() is a lookup plus one multiply-add.
+    """
+    def __init__(self, features=DEFAULT_FEATURES):
+        self.features = [(name, bins if isinstance(bins, (int, type(None))) else np.asarray(bins, dtype=float)) for name, bins in features]
+        if sum(name == "inventory" for name, _ in self.features) != 1:
+            raise ValueError("features must include 'inventory' exactly once")
+        self.day_keys = None
+        self.sizes = None
+
+    def _size(self, bins, max_days):
+        if bins is None:
+            return max_days
+        if isinstance(bins, int):
+            return bins
+        return len(bins) + 1
+
+    def _codes(self, name, bins, values):
+        if bins is None:
+            return np.clip(values, 0, self.max_days - 1).astype(np.int64)
+        if isinstance(bins, int):
+            return np.clip((np.asarray(values) * bins).astype(np.int64), 0, bins - 1)
+        return np.digitize(values, bins).astype(np.int64)
+
+    def fit(self, data, max_days):
+        """
+        Precomputes the per-day key offsets from the processed data.
+        """
+        self.max_days = max_days
+        self.sizes = [self._size(bins, max_days) for _, bins in self.features]
+        self.strides = np.cumprod([1] + self.sizes[:0:-1])[::-1]
+
+        days = np.arange(max_days)
+        self.day_keys = np.zeros(max_days, dtype=np.int64)
+        for (name, bins), stride in zip(self.features, self.strides):
+            if name == "inventory":
+                self.inventory_stride = int(stride)
+                self.inventory_bins = bins
+            else:
+                values = days if name == "day" else data[name].to_numpy(dtype=float)[:max_days]
+                self.day_keys += self._codes(name, bins, values) * stride
+        return self
+
+    @property
+    def num_keys(self):
+        return int(np.prod(self.sizes, dtype=np.int64))
+
+    def encode(self, inventory_level, day):
+        day_index = min(max(day, 0), self.max_days - 1)
+        bins = self.inventory_bins
+        if isinstance(bins, int):
+            inventory_index = min(max(int(inventory_level * bins), 0), bins - 1)
+        else:
+            inventory_index = int(np.digitize(inventory_level, bins))
+        return int(self.day_keys[day_index]) + inventory_index * self.inventory_stride
+
+    def encode_many(self, inventory_levels, days):
+        """
+        Vectorized encode over arrays of inventory levels and days.
+        """
+        day_index = np.clip(days, 0, self.max_days - 1)
+        return self.day_keys[day_index] + self._codes("inventory", self.inventory_bins, inventory_levels) * self.inventory_stride
+
+    def decode(self, key):
+        # Bin index per feature, e.g. for inspecting visited states
+        codes = {}
+        for (name, _), size, stride in zip(self.features, self.sizes, self.strides):
+            codes[name] = int(key // stride % size)
+        return codes
@@ -4,6 +4,7 @@ import plotly.express as px
 import sys
 import os
 from rl_agent import RLAgent
+from simulation import simulate_policy
 from sklearn.preprocessing import MinMaxScaler
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -14,13 +15,29 @@ from environment.rl_environment import SupplyChainEnvironment
 processed_file = "data/final_processed_data.csv"
 schedule_file = "data/f1_race_schedule.csv"
 distances_file = "data/constructors_distances.csv"
-model_file = "models/trained_rl_agent.pkl"
+model_file = "models/trained_rl_agent.npy"
 
-# Load datasets
-try:
+# Cached loaders: read once per process and shared by every session and rerun
+@st.cache_data
+def load_data(schedule_file, processed_file):
     race_schedule = pd.read_csv(schedule_file)
     processed_data = pd.read_csv(processed_file)
     processed_data["date"] = pd.to_datetime(processed_data["date"])
+    return race_schedule, processed_data
+
+@st.cache_resource
+def load_agent(model_file, model_mtime):
+    # model_mtime is part of the cache key so a retrained model is picked up
+    return RLAgent.load_model(model_file, mmap=True)
+
+@st.cache_resource
+def load_policy(model_file, model_mtime):
+    # Deterministic int8 policy derived once per model from the cached Q-table
+    return load_agent(model_file, model_mtime).greedy_policy()
+
+# Load datasets
+try:
+    race_schedule, processed_data = load_data(schedule_file, processed_file)
     st.sidebar.success("Data loaded successfully.")
 except Exception as e:
     st.sidebar.error(f"Error loading data: {e}")
@@ -43,6 +60,12 @@ max_days = st.sidebar.number_input(
     value=180, 
     step=10
 )
+seed = st.sidebar.number_input(
+    "Simulation Seed",
+    min_value=0,
+    value=0,
+    step=1
+)
 
 # Header
 st.title("F1 Supply Chain Management Dashboard")
@@ -89,8 +112,9 @@ st.plotly_chart(fig_demand)
 st.header("RL Agent Decisions and Metrics")
 
 # Load RL Agent
+model_mtime = os.path.getmtime(model_file) if os.path.exists(model_file) else None
 try:
-    agent = RLAgent.load_model(model_file)
+    agent = load_agent(model_file, model_mtime)
     st.success("Trained RL agent loaded successfully.")
 except Exception as e:
     st.error(f"Error loading the RL agent: {e}")
@@ -111,44 +135,29 @@ def calculate_metrics(results_df):
         "Average Action Adjustment (Normalized)": avg_action,
     }
 
-# Display RL agent decisions and metrics if available
-if agent:
-    def simulate_rl(env):
-        state = env.reset()
-        results = []
-        done = False
-
-        while not done:
-            inventory_before = env.current_inve()
-            action = agent.choose_action(state)
-            state, reward, done = env.step(action)
-            inventory_after = env.last_inve()
-            results.append({
-                "Day": env.current_day,
-                "Inventory Before Action": inventory_before,
-                "Inventory After Action": inventory_after,
-                "Action Taken (Inventory Adjustment)": action,
-                "Reward": reward,
-            })
-        return pd.DataFrame(results)
-
-    # Simulate Training
-    env_train = SupplyChainEnvironment(
+@st.cache_data(max_entries=64)
+def run_simulation(model_mtime, max_days, max_inventory, seed):
+    """
+    Memoized rollout keyed by (model mtime, max_days, max_inventory, seed); the oldest
+    entries are evicted past max_entries.
+    """
+    env = SupplyChainEnvironment(
         data_file=processed_file,
         distances_file=distances_file,
         max_days=max_days,
         max_inventory=max_inventory,
+        precompiled=True,
+        seed=seed,
     )
-    train_results_df = simulate_rl(env_train)
+    return simulate_policy(env, load_policy(model_file, model_mtime))
+
+# Display RL agent decisions and metrics if available
+if agent:
+    # Simulate Training
+    train_results_df = run_simulation(model_mtime, max_days, max_inventory, seed)
 
     # Simulate Testing
-    env_test = SupplyChainEnvironment(
-        data_file=processed_file,
-        distances_file=distances_file,
-        max_days=max_days,
-        max_inventory=max_inventory,
-    )
-    test_results_df = simulate_rl(env_test)
+    test_results_df = run_simulation(model_mtime, max_days, max_inventory, seed + 1)
 
     # Calculate metrics
     train_metrics = calculate_metrics(train_results_df)
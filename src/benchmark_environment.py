@@ -0,0 +1,87 @@
+import sys
+import os
+import time
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from environment.rl_environment import SupplyChainEnvironment, BatchSupplyChainEnvironment
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+def run_episodes(env, actions):
+    # Roll out one episode per row of the action matrix and record every transition
+    trajectory = []
+    for episode_actions in actions:
+        env.reset()
+        done = False
+        day = 0
+        while not done:
+            state, reward, done = env.step(int(episode_actions[day]))
+            trajectory.append((state, reward, env.last_inve()))
+            day += 1
+    return trajectory
+
+def benchmark_environment(data_file, distances_file, max_days=180, episodes=50, seed=42):
+    # Same action sequence for both modes so only the environment differs
+    actions = np.random.RandomState(seed).randint(-5, 5, size=(episodes, max_days))
+    results = {}
+    trajectories = {}
+
+    for precompiled in (False, True):
+        env = SupplyChainEnvironment(
+            data_file=data_file,
+            distances_file=distances_file,
+            max_days=max_days,
+            precompiled=precompiled,
+            seed=seed,
+        )
+        start = time.perf_counter()
+        trajectories[precompiled] = run_episodes(env, actions)
+        elapsed = time.perf_counter() - start
+
+        mode = "precompiled" if precompiled else "pandas"
+        results[mode] = episodes * max_days / elapsed
+        logging.info(f"{mode}: {results[mode]:,.0f} steps/sec ({elapsed:.3f}s for {episodes} episodes)")
+
+    identical = trajectories[False] == trajectories[True]
+    logging.info(f"Speedup: {results['precompiled'] / results['pandas']:.1f}x")
+    logging.info(f"Trajectories identical under seed {seed}: {identical}")
+    return results, identical
+
+def benchmark_batch_environment(data_file, distances_file, num_envs=1000, max_days=180, seed=42):
+    # One episode across all copies at once, random actions per copy
+    env = BatchSupplyChainEnvironment(
+        data_file=data_file,
+        distances_file=distances_file,
+        num_envs=num_envs,
+        max_days=max_days,
+        seed=seed,
+    )
+    actions = np.random.RandomState(seed).randint(-5, 5, size=(max_days, num_envs))
+
+    start = time.perf_counter()
+    env.reset()
+    for day in range(max_days):
+        env.step(actions[day])
+    elapsed = time.perf_counter() - start
+
+    steps_per_sec = num_envs * max_days / elapsed
+    logging.info(f"batch x{num_envs}: {steps_per_sec:,.0f} steps/sec ({num_envs / elapsed:,.0f} episodes/sec)")
+    return steps_per_sec
+
+
+if __name__ == "__main__":
+    _, identical = benchmark_environment(
+        data_file="data/final_processed_data.csv",
+        distances_file="data/constructors_distances.csv",
+    )
+    benchmark_batch_environment(
+        data_file="data/final_processed_data.csv",
+        distances_file="data/constructors_distances.csv",
+    )
+    if not identical:
+        logging.error("Precompiled trajectories diverged from the pandas environment.")
+        sys.exit(1)
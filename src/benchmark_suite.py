@@ -0,0 +1,255 @@
+import sys
+import os
+import io
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import contextlib
+import multiprocessing
+from datetime import datetime, timezone
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+DATA_FILE = "data/final_processed_data.csv"
+DISTANCES_FILE = "data/constructors_distances.csv"
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Each case does its (untimed) setup and returns (run, count, unit): run() performs the
+# timed work and count is the number of units it processes per call.
+
+def _make_env(precompiled=True, seed=0):
+    from environment.rl_environment import SupplyChainEnvironment
+    return SupplyChainEnvironment(DATA_FILE, DISTANCES_FILE, max_days=180, precompiled=precompiled, seed=seed)
+
+def _make_agent(env, seed=0):
+    from rl_agent import RLAgent
+    return RLAgent(state_size=env.state_size, action_size=11, seed=seed, dtype=np.float32)
+
+def case_env_step(quick, precompiled=True):
+    env = _make_env(precompiled)
+    episodes = 5 if quick else 50
+    actions = np.random.RandomState(0).randint(-5, 5, size=(episodes, env.max_days)).tolist()
+
+    def run():
+        for episode_actions in actions:
+            env.reset()
+            for action in episode_actions:
+                env.step(action)
+    return run, episodes * env.max_days, "steps"
+
+def case_env_step_pandas(quick):
+    return case_env_step(quick, precompiled=False)
+
+def case_env_reset(quick):
+    env = _make_env()
+    resets = 10_000 if quick else 100_000
+
+    def run():
+        for _ in range(resets):
+            env.reset()
+    return run, resets, "resets"
+
+def case_agent_choose_action(quick):
+    env = _make_env()
+    agent = _make_agent(env)
+    agent.epsilon = 0.5
+    states = np.random.RandomState(0).randint(0, env.state_size, size=20_000 if quick else 200_000).tolist()
+
+    def run():
+        for state in states:
+            agent.choose_action(state)
+    return run, len(states), "calls"
+
+def case_agent_learn(quick):
+    env = _make_env()
+    agent = _make_agent(env)
+    rng = np.random.RandomState(0)
+    count = 20_000 if quick else 200_000
+    transitions = list(zip(
+        rng.randint(0, env.state_size, count).tolist(),
+        rng.randint(-5, 5, count).tolist(),
+        rng.choice([-1000, -100, 0, 100], count).tolist(),
+        rng.randint(0, env.state_size, count).tolist(),
+    ))
+
+    def run():
+        for state, action, reward, next_state in transitions:
+            agent.learn(state, action, reward, next_state)
+    return run, count, "updates"
+
+def case_train_agent(quick):
+    from train_rl_agent import train_agent
+    env = _make_env()
+    episodes = 10 if quick else 100
+
+    def run():
+        train_agent(env, _make_agent(env), episodes, rewards_file=None)
+    return run, episodes, "episodes"
+
+def case_simulate_rl(quick):
+    from simulation import simulate_rl
+    env = _make_env()
+    agent = _make_agent(env)
+    episodes = 5 if quick else 50
+
+    def run():
+        for _ in range(episodes):
+            simulate_rl(env, agent)
+    return run, episodes, "episodes"
+
+def case_simulate_policy(quick):
+    from simulation import simulate_policy
+    env = _make_env()
+    policy = _make_agent(env).greedy_policy()
+    episodes = 50 if quick else 500
+
+    def run():
+        for _ in range(episodes):
+            simulate_policy(env, policy)
+    return run, episodes, "episodes"
+
+def case_generate_supply_chain_data(quick):
+    from generate_synthetic_data import generate_supply_chain_data
+    from telemetry_store import STORE_ROOT
+    output_file = os.path.join(tempfile.mkdtemp(), "supply_chain.csv")
+    runs = 2 if quick else 10
+
+    def run():
+        np.random.seed(0)
+        for _ in range(runs):
+            generate_supply_chain_data(
+                "data/f1_race_schedule.csv",
+                STORE_ROOT,
+                "data/constructors_distances.csv",
+                "data/engine_manufacturers_distances.csv",
+                "data/tyre_manufacturers_distances.csv",
+                180,
+                output_file,
+            )
+    return run, runs, "runs"
+
+def case_preprocess_files(quick):
+    from data_preprocessing import preprocess_files
+    output_file = os.path.join(tempfile.mkdtemp(), "final_processed_data.csv")
+    runs = 2 if quick else 10
+
+    def run():
+        for _ in range(runs):
+            preprocess_files(output_file=output_file)
+    return run, runs, "runs"
+
+CASES = {
+    "env_step": case_env_step,
+    "env_step_pandas": case_env_step_pandas,
+    "env_reset": case_env_reset,
+    "agent_choose_action": case_agent_choose_action,
+    "agent_learn": case_agent_learn,
+    "train_agent": case_train_agent,
+    "simulate_rl": case_simulate_rl,
+    "simulate_policy": case_simulate_policy,
+    "generate_supply_chain_data": case_generate_supply_chain_data,
+    "preprocess_files": case_preprocess_files,
+}
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1 / 1024 ** 2 if sys.platform == "darwin" else 1 / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+def _run_case(name, quick):
+    # Runs in a fresh process so peak RSS belongs to this case alone
+    logging.getLogger().setLevel(logging.WARNING)
+    with contextlib.redirect_stdout(io.StringIO()):
+        run, count, unit = CASES[name](quick)
+
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        peak_rss_mb = _peak_rss_mb()
+
+        # Separate traced pass: tracemalloc slows the run down, so it is not timed
+        tracemalloc.start()
+        run()
+        _, alloc_peak = tracemalloc.get_traced_memory()
+        alloc_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        tracemalloc.stop()
+
+    return {
+        "unit": unit,
+        "count": count,
+        "seconds": elapsed,
+        "per_sec": count / elapsed,
+        "peak_rss_mb": peak_rss_mb,
+        "alloc_peak_mb": alloc_peak / 1024 ** 2,
+        "alloc_live_blocks": alloc_blocks,
+    }
+
+def run_suite(cases=None, quick=False):
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for name in cases or CASES:
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(_run_case, (name, quick))
+        result = results[name]
+        logging.info(
+            f"{name:<28} {result['per_sec']:>14,.1f} {result['unit']}/sec"
+            f"  peak RSS {result['peak_rss_mb'] or 0:7.1f} MB  alloc peak {result['alloc_peak_mb']:7.1f} MB"
+        )
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "quick": quick,
+        "results": results,
+    }
+
+def compare_results(current, baseline, tolerance=0.2):
+    """
+    Names of cases whose throughput dropped by more than tolerance against the baseline.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous and result["per_sec"] < previous["per_sec"] * (1 - tolerance):
+            logging.warning(
+                f"Regression in {name}: {result['per_sec']:,.1f} vs {previous['per_sec']:,.1f} {result['unit']}/sec"
+            )
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the training and data pipelines on the bundled data.")
+    parser.add_argument("--only", nargs="+", choices=list(CASES), help="Run only these cases")
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads for a fast smoke run")
+    parser.add_argument("--output", default="models/benchmark_results.json")
+    parser.add_argument("--compare", help="Baseline JSON to check for throughput regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before flagging")
+    args = parser.parse_args()
+
+    report = run_suite(args.only, args.quick)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    logging.info(f"Benchmark results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if compare_results(report, baseline, args.tolerance):
+            sys.exit(1)
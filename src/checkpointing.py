@@ -0,0 +1,109 @@
+import os
+import json
+import numpy as np
+
+class Checkpointer:
+    """
+    Periodic, crash-safe training checkpoints in a directory:
+
+    - q_table_0.npy / q_table_1.npy: two memory-mapped Q-table slots written alternately,
+      so a crash mid-write never touches the slot the last checkpoint points to
+    - rewards.bin: episode rewards appended as float64 (whole numbers are restored as
+      ints), only new episodes are written
+    - state.json: episode count, epsilon, agent/env RNG states, active table slot and
+      reward count; replaced atomically, so it always describes a complete checkpoint
+    """
+    def __init__(self, directory="models/checkpoints", every=50):
+        # every=0 only restores, it never writes
+        self.directory = directory
+        self.every = int(every)
+        self.state_file = os.path.join(directory, "state.json")
+        self.rewards_file = os.path.join(directory, "rewards.bin")
+        self._tables = {}
+        self._saved_rewards = 0
+        self._slot = 1
+
+    def exists(self):
+        return os.path.exists(self.state_file)
+
+    def _table(self, slot, q_table):
+        # Memory-mapped slot, (re)created when missing or shaped differently
+        path = os.path.join(self.directory, f"q_table_{slot}.npy")
+        table = self._tables.get(slot)
+        if table is None or table.shape != q_table.shape or table.dtype != q_table.dtype:
+            if os.path.exists(path):
+                table = np.load(path, mmap_mode="r+")
+            if table is None or table.shape != q_table.shape or table.dtype != q_table.dtype:
+                table = np.lib.format.open_memmap(path, mode="w+", dtype=q_table.dtype, shape=q_table.shape)
+            self._tables[slot] = table
+        return table
+
+    def maybe_save(self, env, agent, episodes_done, rewards_log):
+        if self.every > 0 and episodes_done % self.every == 0:
+            self.save(env, agent, episodes_done, rewards_log)
+
+    def save(self, env, agent, episodes_done, rewards_log):
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Write the inactive slot, then flip to it in state.json
+        slot = 1 - self._slot
+        table = self._table(slot, agent.q_table)
+        table[:] = agent.q_table
+        table.flush()
+
+        # A fresh run starts a new rewards file instead of appending to a stale one
+        with open(self.rewards_file, "ab" if self._saved_rewards else "wb") as file:
+            np.asarray(rewards_log[self._saved_rewards:], dtype=np.float64).tofile(file)
+            file.flush()
+            os.fsync(file.fileno())
+
+        state = {
+            "episodes_done": episodes_done,
+            "epsilon": agent.epsilon,
+            "table_slot": slot,
+            "rewards_count": len(rewards_log),
+            "agent_rng": _rng_state(agent.rng),
+            "env_rng": _rng_state(env.rng),
+        }
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, "w") as file:
+            json.dump(state, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_file, self.state_file)
+
+        self._slot = slot
+        self._saved_rewards = len(rewards_log)
+
+    def restore(self, env, agent):
+        """
+        Loads the latest checkpoint into env and agent. Returns (episodes_done, rewards_log).
+        """
+        with open(self.state_file) as file:
+            state = json.load(file)
+
+        slot = state["table_slot"]
+        agent.q_table = np.array(np.load(os.path.join(self.directory, f"q_table_{slot}.npy")))
+        agent.epsilon = state["epsilon"]
+        _set_rng_state(agent.rng, state["agent_rng"])
+        _set_rng_state(env.rng, state["env_rng"])
+
+        # Drop rewards appended after the last complete checkpoint
+        rewards = np.fromfile(self.rewards_file, dtype=np.float64, count=state["rewards_count"])
+        with open(self.rewards_file, "r+b") as file:
+            file.truncate(state["rewards_count"] * 8)
+
+        self._slot = slot
+        self._saved_rewards = state["rewards_count"]
+        # Rewards are stored as float64; whole numbers come back as the ints the episodes
+        # produced, so a resumed run logs the same values as an uninterrupted one
+        return state["episodes_done"], [int(reward) if reward.is_integer() else reward for reward in rewards.tolist()]
+
+def _rng_state(rng):
+    # Works for both np.random.RandomState and the global np.random module
+    name, keys, pos, has_gauss, cached_gaussian = rng.get_state()
+    return [name, keys.tolist(), pos, has_gauss, cached_gaussian]
+
+def _set_rng_state(rng, state):
+    name, keys, pos, has_gauss, cached_gaussian = state
+    rng.set_state((name, np.array(keys, dtype=np.uint32), pos, has_gauss, cached_gaussian))
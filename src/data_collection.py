@@ -1,9 +1,14 @@
 import fastf1
 import pandas as pd
 import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from telemetry_store import STORE_ROOT, write_race_telemetry
+from schedule_index import ScheduleIndex
 
-# Enable Fast F1 cache
-fastf1.Cache.enable_cache('cache')
+# Fast F1 cache directory, enabled by the command line run
+CACHE_DIR = 'cache'
 
 # Function to fetch race schedule for a given year
 def fetch_race_schedule(year, output_file):
@@ -19,44 +24,104 @@ def fetch_race_schedule(year, output_file):
     except Exception as e:
         print(f"Failed to fetch race schedule for {year}: {e}")
 
-def fetch_race_telemetry(year, event_name, output_file):
-    try:
-        print(f"Fetching telemetry for {event_name} ({year})...")
-        session = fastf1.get_session(year, event_name, 'R')  # Fetch race session by name
-        session.load()  # Load telemetry data
+def load_race_telemetry(year, event_name, store_root=STORE_ROOT, get_session=None):
+    # Loads one race session and writes its laps and pit stops to the store; raises on failure
+    get_session = get_session or fastf1.get_session
+    print(f"Fetching telemetry for {event_name} ({year})...")
+    session = get_session(year, event_name, 'R')  # Fetch race session by name
+    session.load()  # Load telemetry data
 
-        # Example: Inspect results to find available columns
-        print("Available columns in session results:", session.results.columns)
+    # Example: Inspect results to find available columns
+    print("Available columns in session results:", session.results.columns)
 
-        # Calculate pit stops from lap data
-        laps = session.laps
-        pit_stops = laps[laps['PitOutTime'].notna() | laps['PitInTime'].notna()]
-        pit_stops_count = pit_stops.groupby('Driver')['PitOutTime'].count().reset_index()
-        pit_stops_count.rename(columns={'PitOutTime': 'PitStopCount'}, inplace=True)
+    # Calculate pit stops from lap data
+    laps = session.laps
+    pit_stops = laps[laps['PitOutTime'].notna() | laps['PitInTime'].notna()]
+    pit_stops_count = pit_stops.groupby('Driver')['PitOutTime'].count().reset_index()
+    pit_stops_count.rename(columns={'PitOutTime': 'PitStopCount'}, inplace=True)
 
-        # Save lap and pit stop data
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        laps.to_csv(output_file.replace('.csv', '_laps.csv'), index=False)
-        pit_stops_count.to_csv(output_file.replace('.csv', '_pitstops.csv'), index=False)
-        print(f"Telemetry data and calculated pit stops saved for {event_name}")
+    # Save lap and pit stop data to the season/event partitions of the store
+    write_race_telemetry(year, event_name, laps, pit_stops_count, store_root)
+    print(f"Telemetry data and calculated pit stops saved for {event_name}")
+
+def fetch_race_telemetry(year, event_name, store_root=STORE_ROOT, get_session=None):
+    try:
+        load_race_telemetry(year, event_name, store_root, get_session)
+        return True
     except Exception as e:
         print(f"Failed to fetch telemetry for {event_name}: {e}")
+        return False
+
+def _fetch_with_retries(year, event_name, store_root, retries, retry_delay, get_session):
+    # Returns (attempts, error) where error is None on success
+    last_error = None
+    for attempt in range(1, retries + 2):
+        try:
+            load_race_telemetry(year, event_name, store_root, get_session)
+            return attempt, None
+        except Exception as e:
+            last_error = str(e)
+            print(f"Attempt {attempt} failed for {event_name} ({year}): {e}")
+            if attempt <= retries:
+                time.sleep(retry_delay)
+    return attempt, last_error
 
+def collect_telemetry(schedule, store_root=STORE_ROOT, max_workers=4, retries=2, retry_delay=5.0, get_session=None):
+    """
+    Fetches telemetry for every race in schedule (a ScheduleIndex over one or more seasons)
+    on a thread pool into the season/event partitions of the telemetry store. Returns one
+    row per race with its status, attempts and last error. get_session can be replaced by
+    a stub with the fastf1.get_session signature for offline runs.
+    """
+    # Races only: non-race events like pre-season testing are excluded by the index
+    races = schedule.races()
+    jobs = list(zip(races['Season'], races['EventName']))
 
+    report = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(_fetch_with_retries, year, event_name, store_root, retries, retry_delay, get_session): (year, event_name)
+            for year, event_name in jobs
+        }
+        for future in as_completed(futures):
+            year, event_name = futures[future]
+            attempts, error = future.result()
+            report.append({
+                "Year": year,
+                "EventName": event_name,
+                "Status": "ok" if error is None else "failed",
+                "Attempts": attempts,
+                "Error": error,
+            })
+
+    report = pd.DataFrame(report, columns=["Year", "EventName", "Status", "Attempts", "Error"])
+    report = report.sort_values(["Year", "EventName"]).reset_index(drop=True)
+    failed = report[report["Status"] == "failed"]
+    print(f"Collected {len(report) - len(failed)}/{len(report)} races.")
+    for _, race in failed.iterrows():
+        print(f"Failed: {race['EventName']} ({race['Year']}) after {race['Attempts']} attempts: {race['Error']}")
+    return report
 
 
 if __name__ == "__main__":
-    # Fetch schedule for the 2023 season
-    schedule_file = "data/f1_race_schedule.csv"
-    fetch_race_schedule(2023, schedule_file)
-
-    # Fetch telemetry for each race in the schedule
-    race_schedule = pd.read_csv(schedule_file)
-    # Filter out non-race events like pre-season testing
-    race_schedule = race_schedule[race_schedule['EventName'] != "Pre-Season Testing"]
-
-    # Fetch telemetry for each race in the schedule
-    for _, race in race_schedule.iterrows():
-        event_name = race['EventName']
-        telemetry_file = f"data/telemetry_{event_name.replace(' ', '_')}.csv"
-        fetch_race_telemetry(2023, event_name, telemetry_file)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Collect FastF1 race schedules and telemetry.")
+    parser.add_argument("--seasons", type=int, nargs="+", default=[2023])
+    parser.add_argument("--workers", type=int, default=4, help="Races fetched concurrently")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per race after the first failure")
+    args = parser.parse_args()
+
+    # Enable Fast F1 cache
+    fastf1.Cache.enable_cache(CACHE_DIR)
+
+    # Fetch the schedule for each season; a single season keeps the original data/ layout
+    schedule_files = []
+    for year in args.seasons:
+        if len(args.seasons) == 1:
+            schedule_file = "data/f1_race_schedule.csv"
+        else:
+            schedule_file = f"data/{year}/f1_race_schedule.csv"
+        fetch_race_schedule(year, schedule_file)
+        schedule_files.append(schedule_file)
+
+    # Fetch telemetry for each race in the schedules
+    collect_telemetry(ScheduleIndex.from_csv(*schedule_files), max_workers=args.workers, retries=args.retries)
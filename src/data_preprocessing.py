@@ -1,13 +1,84 @@
 import os
+import glob
+import json
+import hashlib
+import argparse
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
-
-def preprocess_files():
+from telemetry_store import STORE_ROOT, load_pitstops
+from schedule_index import ScheduleIndex
+
+def total_normalized_pit_stops(pit_stop_df, scaler):
+    # Normalize pit stop counts within the race and sum them
+    return scaler.fit_transform(pit_stop_df[["PitStopCount"]]).sum()
+
+def _file_hash(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def incremental_pit_stop_totals(seasons, store_root, manifest_file, scaler):
+    """
+    Per-race total normalized pit stops, recomputed only for pit stop partitions whose
+    contents changed since the last run. The manifest records each input file's mtime,
+    size and SHA-256 next to its cached aggregate; an unchanged mtime/size skips hashing.
+    Returns ({(season, event slug): total}, number of races recomputed).
+    """
+    manifest = {}
+    if os.path.exists(manifest_file):
+        with open(manifest_file, encoding="utf-8") as file:
+            manifest = json.load(file)
+
+    totals = {}
+    updated_manifest = {}
+    recomputed = 0
+    for season in seasons:
+        pattern = os.path.join(store_root, "pitstops", f"season={season}", "event=*", "*.parquet")
+        for file_path in sorted(glob.glob(pattern)):
+            key = os.path.relpath(file_path, store_root)
+            event = os.path.basename(os.path.dirname(file_path))[len("event="):]
+            stat = os.stat(file_path)
+            entry = manifest.get(key)
+
+            if entry and (entry["mtime"], entry["size"]) != (stat.st_mtime, stat.st_size):
+                # Touched file: only recompute if the contents actually changed
+                file_hash = _file_hash(file_path)
+                entry = dict(entry, mtime=stat.st_mtime, size=stat.st_size) if entry["sha256"] == file_hash else None
+            if entry is None:
+                pit_stop_df = pd.read_parquet(file_path, columns=["PitStopCount"])
+                entry = {
+                    "mtime": stat.st_mtime,
+                    "size": stat.st_size,
+                    "sha256": _file_hash(file_path),
+                    "season": int(season),
+                    "event": event,
+                    "total": float(total_normalized_pit_stops(pit_stop_df, scaler)),
+                }
+                recomputed += 1
+
+            updated_manifest[key] = entry
+            race = (entry["season"], entry["event"])
+            totals[race] = totals.get(race, 0.0) + entry["total"]
+
+    # Files that disappeared simply drop out of the rewritten manifest
+    os.makedirs(os.path.dirname(manifest_file) or ".", exist_ok=True)
+    tmp_file = f"{manifest_file}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as file:
+        json.dump(updated_manifest, file, indent=1, sort_keys=True, ensure_ascii=False)
+    os.replace(tmp_file, manifest_file)
+    return totals, recomputed
+
+def preprocess_files(
+    incremental=False,
+    manifest_file="cache/preprocessing_manifest.json",
+    output_file="data/final_processed_data.csv",
+):
     # Define file paths
-    pitstop_folder = "data"  # Folder containing telemetry_*_pitstops.csv files
+    telemetry_store = STORE_ROOT  # Parquet store with per-race pit stop counts
     supply_chain_file = "data/supply_chain_data_with_distances.csv"
     race_schedule_file = "data/f1_race_schedule.csv"
-    output_file = "data/final_processed_data.csv"
 
     # Load race schedule and supply chain data
     race_schedule = pd.read_csv(race_schedule_file)
@@ -21,29 +92,32 @@ def preprocess_files():
     # Aggregate all pit stop data
     pit_stop_data = []
 
-    # Process all telemetry pit stop files in the specified folder
-    for filename in os.listdir(pitstop_folder):
-        if filename.startswith("telemetry_") and filename.endswith("_pitstops.csv"):
-            file_path = os.path.join(pitstop_folder, filename)
-            pit_stop_df = pd.read_csv(file_path)
-
-            # Extract race name from file name
-            race_name = filename.replace("telemetry_", "").replace("_pitstops.csv", "").replace("_", " ")
-
-            # Normalize pit stop counts
-            if "PitStopCount" in pit_stop_df.columns:
-                pit_stop_df["NormalizedPitStops"] = scaler.fit_transform(pit_stop_df[["PitStopCount"]])
-
-            # Summarize total normalized pit stops for the race
-            total_pit_stops = pit_stop_df["NormalizedPitStops"].sum()
-            event_date = race_schedule.loc[race_schedule["EventName"] == race_name, "EventDate"].values[0]
-
-            # Append to aggregated data
-            pit_stop_data.append({
-                "EventName": race_name,
-                "EventDate": event_date,
-                "TotalNormalizedPitStops": total_pit_stops
-            })
+    # Summarize total normalized pit stops per race for the schedule's seasons only
+    seasons = race_schedule["EventDate"].dt.year.unique()
+    if incremental:
+        pit_stop_totals, recomputed = incremental_pit_stop_totals(seasons, telemetry_store, manifest_file, scaler)
+        print(f"Recomputed pit stop aggregates for {recomputed}/{len(pit_stop_totals)} races.")
+    else:
+        pit_stops = load_pitstops(columns=["PitStopCount"], seasons=seasons, store_root=telemetry_store)
+        pit_stop_totals = {
+            race: total_normalized_pit_stops(pit_stop_df, scaler)
+            for race, pit_stop_df in pit_stops.groupby(["season", "event"], observed=True)
+        }
+
+    # Resolve each telemetry partition to its scheduled race through the schedule index
+    schedule = ScheduleIndex(race_schedule)
+    for (season, event), total_pit_stops in pit_stop_totals.items():
+        race = schedule.lookup(event, season)
+        if race is None:
+            print(f"Skipping pit stops for {event} ({season}): not in the race schedule.")
+            continue
+
+        # Append to aggregated data
+        pit_stop_data.append({
+            "EventName": race["EventName"],
+            "EventDate": race["EventDate"],
+            "TotalNormalizedPitStops": total_pit_stops
+        })
 
     # Create a DataFrame from aggregated pit stop data
     pit_stop_summary = pd.DataFrame(pit_stop_data)
@@ -81,4 +155,8 @@ def preprocess_files():
 
 
 if __name__ == "__main__":
-    preprocess_files()
+    parser = argparse.ArgumentParser(description="Build the final processed supply chain dataset.")
+    parser.add_argument("--incremental", action="store_true", help="Reuse cached per-race aggregates for unchanged telemetry")
+    args = parser.parse_args()
+
+    preprocess_files(incremental=args.incremental)
@@ -0,0 +1,104 @@
+import sys
+import os
+import json
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from environment.rl_environment import SupplyChainEnvironment, INVENTORY_BUCKETS
+from rl_agent import RLAgent
+from policy_evaluation import evaluate_policy
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+ACTIONS = np.arange(-5, 6)  # Inventory adjustments, Q-table column = action + 5
+NOISE_LOW, NOISE_HIGH = 0.95, 1.05  # Demand noise range used by step
+
+def state_levels(env):
+    """
+    Representative inventory level of every (day, bucket) state: the data's exact level for
+    the bucket an episode actually visits on that day, the bucket midpoint elsewhere.
+    """
+    levels = np.tile((np.arange(INVENTORY_BUCKETS) + 0.5) / INVENTORY_BUCKETS, (env.max_days, 1))
+    visited = env.episode_states() % INVENTORY_BUCKETS
+    levels[np.arange(env.max_days), visited] = env.inventory_array[:env.max_days]
+    return levels
+
+def _demand_cdf(threshold, demand):
+    # P(demand * U(0.95, 1.05) < threshold), for arrays broadcast against each other
+    low, width = demand * NOISE_LOW, demand * (NOISE_HIGH - NOISE_LOW)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cdf = np.clip((threshold - low) / width, 0, 1)
+    # Zero demand is a point mass at 0
+    return np.where(width > 0, cdf, np.greater(threshold, 0).astype(float))
+
+def expected_rewards(env, levels=None):
+    """
+    Exact expected compute_reward over the demand noise for every state and action,
+    shape (max_days, INVENTORY_BUCKETS, 11).
+    """
+    if levels is None:
+        levels = state_levels(env)
+    inventory = np.clip(levels[:, :, None] + ACTIONS / 7, 0, env.max_inventory)
+    demand = env.demand_array[:env.max_days, None, None]
+
+    below_half = _demand_cdf(0.5, demand)
+    stockout = (inventory < 0.5) * (1 - below_half) * -1000
+    overstock = (inventory > 0.5) * below_half * -100
+    covered = (inventory < 0.5) * _demand_cdf(np.minimum(inventory, 0.5), demand) * 100
+    return stockout + overstock + covered
+
+def solve(env, gamma=0.95, dtype=np.float64):
+    """
+    Finite-horizon backward induction. Every action leads to the same next state (each day
+    starts from the data's inventory level), so Q(d, s, a) = E[r(d, s, a)] + gamma * V(d+1),
+    where V(d+1) is the value of the state visited on day d+1 and V(max_days) = 0. The
+    Bellman backup for all states and actions of a day is one array operation.
+    Returns a (state_size, 11) Q-table in RLAgent's layout.
+    """
+    rewards = expected_rewards(env)
+    visited = env.episode_states() % INVENTORY_BUCKETS
+    q_values = np.empty_like(rewards)
+    next_value = 0.0
+    for day in range(env.max_days - 1, -1, -1):
+        q_values[day] = rewards[day] + gamma * next_value
+        next_value = q_values[day, visited[day]].max()
+    return q_values.reshape(env.state_size, len(ACTIONS)).astype(dtype)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve the supply chain MDP exactly by backward induction.")
+    parser.add_argument("--gamma", type=float, default=0.95)
+    parser.add_argument("--output", default="models/dp_rl_agent.npy")
+    parser.add_argument("--compare", default="models/trained_rl_agent.npy", help="Learned Q-table to evaluate against the exact policy")
+    parser.add_argument("--rollouts", type=int, default=5_000, help="Monte-Carlo rollouts per policy for the comparison (0 = skip)")
+    args = parser.parse_args()
+
+    env_kwargs = dict(
+        data_file="data/final_processed_data.csv",
+        distances_file="data/constructors_distances.csv",
+        max_days=180,
+        max_inventory=500,
+    )
+    env = SupplyChainEnvironment(**env_kwargs, precompiled=True)
+
+    agent = RLAgent(state_size=env.state_size, action_size=len(ACTIONS), gamma=args.gamma)
+    agent.q_table = solve(env, args.gamma)
+    agent.save_model(args.output)
+
+    if args.rollouts > 0:
+        results = {"exact": evaluate_policy(env_kwargs, agent.greedy_policy(), args.rollouts)}
+        learned = RLAgent.load_model(args.compare)
+        if learned is not None:
+            results["learned"] = evaluate_policy(env_kwargs, learned.greedy_policy(), args.rollouts)
+        for name, summary in results.items():
+            logging.info(
+                f"{name:>8}: reward {summary['reward_mean']:.1f} "
+                f"(95% CI {summary['reward_ci_low']:.1f} to {summary['reward_ci_high']:.1f}), "
+                f"stockout days {summary['stockout_day_rate']:.2%}"
+            )
+        with open(os.path.splitext(args.output)[0] + "_comparison.json", "w") as file:
+            json.dump({name: {k: v for k, v in summary.items() if k != "inventory_histogram"} for name, summary in results.items()}, file, indent=2)
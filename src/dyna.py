@@ -0,0 +1,100 @@
+import heapq
+import numpy as np
+
+class DynaPlanner:
+    """
+    Dyna-style planning for RLAgent. Every real transition is stored in an array-backed
+    deterministic model (last reward and next state per state-action pair), then
+    planning_steps simulated transitions from the model are backed up in one vectorized
+    update. Planning never decays the agent's epsilon.
+
+    Transitions are sampled uniformly from the observed pairs, or, with prioritized=True,
+    popped from a max-heap keyed by |TD error| (prioritized sweeping): after a backup, the
+    observed predecessors of the updated states are re-queued if their own TD error
+    exceeds theta.
+    """
+    def __init__(self, state_size, action_size, planning_steps=10, prioritized=False, theta=1e-3, seed=None):
+        self.action_size = action_size
+        self.planning_steps = planning_steps
+        self.prioritized = prioritized
+        self.theta = theta
+        self.rng = np.random if seed is None else np.random.RandomState(seed)
+
+        # Model, indexed by state * action_size + action_index
+        size = state_size * action_size
+        self.rewards = np.zeros(size, dtype=np.float32)
+        self.next_states = np.full(size, -1, dtype=np.int32)
+        self.observed = np.zeros(size, dtype=np.int64)  # Seen pairs, first num_observed entries
+        self.num_observed = 0
+
+        # Prioritized sweeping: heap of (-priority, pair); stale entries are skipped on pop
+        self.priority = np.zeros(size, dtype=np.float64)
+        self.queue = []
+        self.predecessors = {}  # next_state -> list of pairs leading to it
+
+    def update(self, agent, state, action, reward, next_state, td_error):
+        """
+        Records a real transition and runs the planning backups. Call after agent.learn.
+        """
+        pair = state * self.action_size + action + 5
+        if self.next_states[pair] < 0:
+            self.observed[self.num_observed] = pair
+            self.num_observed += 1
+            self.predecessors.setdefault(next_state, []).append(pair)
+        elif self.next_states[pair] != next_state:
+            self.predecessors[int(self.next_states[pair])].remove(pair)
+            self.predecessors.setdefault(next_state, []).append(pair)
+        self.rewards[pair] = reward
+        self.next_states[pair] = next_state
+
+        if self.planning_steps <= 0:
+            return
+        if self.prioritized:
+            self._push(pair, abs(td_error))
+            self._sweep(agent)
+        else:
+            pairs = self.observed[self.rng.randint(0, self.num_observed, size=self.planning_steps)]
+            self._backup(agent, pairs)
+
+    def _backup(self, agent, pairs):
+        # Plain Q-learning backup. learn's extra 0.3 * Q term has a fixed point of 1.75x the
+        # TD target, which makes repeated backups of the same transitions diverge.
+        states, action_idx = np.divmod(pairs, self.action_size)
+        td_target = self.rewards[pairs] + agent.gamma * np.max(agent.q_table[self.next_states[pairs]], axis=1)
+        td_error = td_target - agent.q_table[states, action_idx]
+
+        # Duplicate pairs are averaged into one update, as in learn_batch
+        unique_pairs, inverse = np.unique(pairs, return_inverse=True)
+        totals = np.bincount(inverse, weights=td_error, minlength=len(unique_pairs))
+        counts = np.bincount(inverse, minlength=len(unique_pairs))
+        agent.q_table.flat[unique_pairs] += agent.alpha * totals / counts
+
+    def _push(self, pair, priority):
+        if priority > self.theta and priority > self.priority[pair]:
+            self.priority[pair] = priority
+            heapq.heappush(self.queue, (-priority, pair))
+
+    def _sweep(self, agent):
+        pairs = []
+        while self.queue and len(pairs) < self.planning_steps:
+            priority, pair = heapq.heappop(self.queue)
+            if -priority == self.priority[pair]:
+                self.priority[pair] = 0.0
+                pairs.append(pair)
+        if not pairs:
+            return
+        pairs = np.array(pairs)
+        self._backup(agent, pairs)
+
+        # Re-queue predecessors of the updated states by their current TD error
+        updated_states = np.unique(pairs // self.action_size)
+        predecessors = [self.predecessors.get(int(state), []) for state in updated_states]
+        predecessors = np.fromiter((pair for group in predecessors for pair in group), dtype=np.int64)
+        if len(predecessors) == 0:
+            return
+        states, action_idx = np.divmod(predecessors, self.action_size)
+        td_target = self.rewards[predecessors] + agent.gamma * np.max(agent.q_table[self.next_states[predecessors]], axis=1)
+        td_errors = np.abs(td_target - agent.q_table[states, action_idx])
+        rising = (td_errors > self.theta) & (td_errors > self.priority[predecessors])
+        for pair, priority in zip(predecessors[rising].tolist(), td_errors[rising].tolist()):
+            self._push(pair, priority)
@@ -0,0 +1,91 @@
+import time
+from collections import deque
+import numpy as np
+
+def _parameters(agent):
+    # The dense Q-table, or the weights of a function-approximation agent
+    return agent.q_table if hasattr(agent, "q_table") else agent.weights
+
+class EarlyStopping:
+    """
+    Convergence detection for episode-based training. Two criteria, either of which stops
+    training once it has held for `patience` consecutive episodes:
+
+    - reward plateau: the moving average of the last `window` episode rewards has not
+      improved on its best value by more than min_delta
+    - Q-table stability (when q_delta_tol is set): the largest absolute Q-value change
+      (weight change for TileCodingAgent) over an episode stayed below q_delta_tol
+
+    After training, episodes_run (including resumed episodes), seconds (this run only) and
+    reason describe where and why it stopped.
+    """
+    def __init__(self, window=50, patience=100, min_delta=0.0, q_delta_tol=None):
+        self.window = max(int(window), 1)
+        self.patience = max(int(patience), 1)
+        self.min_delta = min_delta
+        self.q_delta_tol = q_delta_tol
+        self._rewards = deque(maxlen=self.window)
+        self._reward_sum = 0.0
+        self._best_average = -np.inf
+        self._reward_wait = 0
+        self._q_wait = 0
+        self._previous_q = None
+        self._start = None
+        self.episodes_run = 0
+        self.seconds = 0.0
+        self.reason = None
+        self.max_q_delta = None
+
+    def start(self, episodes_done=0):
+        # episodes_done: episodes already trained before this run (e.g. restored from a checkpoint)
+        self._start = time.perf_counter()
+        self.episodes_run = episodes_done
+
+    def start_episode(self, agent):
+        if self._start is None:
+            self.start()
+        if self.q_delta_tol is not None:
+            # Reused buffer: one copy per episode, no allocation
+            parameters = _parameters(agent)
+            if self._previous_q is None or self._previous_q.shape != parameters.shape:
+                self._previous_q = np.empty_like(parameters)
+            np.copyto(self._previous_q, parameters)
+
+    def update(self, agent, total_reward):
+        """
+        Records a finished episode. Returns True when training should stop.
+        """
+        self.episodes_run += 1
+        self.seconds = time.perf_counter() - self._start
+
+        if len(self._rewards) == self.window:
+            self._reward_sum -= self._rewards[0]
+        self._rewards.append(total_reward)
+        self._reward_sum += total_reward
+        if len(self._rewards) == self.window:
+            average = self._reward_sum / self.window
+            if average > self._best_average + self.min_delta:
+                self._best_average = average
+                self._reward_wait = 0
+            else:
+                self._reward_wait += 1
+            if self._reward_wait >= self.patience:
+                self.reason = f"moving average reward has not improved for {self.patience} episodes"
+                return True
+
+        if self.q_delta_tol is not None:
+            self.max_q_delta = float(np.max(np.abs(_parameters(agent) - self._previous_q)))
+            self._q_wait = self._q_wait + 1 if self.max_q_delta < self.q_delta_tol else 0
+            if self._q_wait >= self.patience:
+                self.reason = f"max Q-value change below {self.q_delta_tol} for {self.patience} episodes"
+                return True
+        return False
+
+    def summary(self):
+        return {
+            "episodes_run": self.episodes_run,
+            "seconds": self.seconds,
+            "stopped_early": self.reason is not None,
+            "reason": self.reason,
+            "best_average_reward": None if np.isinf(self._best_average) else self._best_average,
+        }
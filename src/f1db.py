@@ -0,0 +1,95 @@
+import os
+import pandas as pd
+
+# Bundled F1DB CSV snapshot and its binary cache
+F1DB_FOLDER = "data/f1db"
+CACHE_FOLDER = "cache/f1db"
+
+# Explicit column types for the tables the pipeline reads. For every other table, "id"
+# columns are read as strings and "...Id" foreign keys as categoricals; numeric columns
+# keep pandas' numeric parsing.
+DTYPES = {
+    "countries": {
+        "id": "string", "alpha2Code": "string", "alpha3Code": "string",
+        "name": "string", "demonym": "string", "continentId": "category",
+    },
+    "continents": {"id": "string", "code": "string", "name": "string", "demonym": "string"},
+    "constructors": {"id": "string", "name": "string", "fullName": "string", "countryId": "category"},
+    "engine-manufacturers": {"id": "string", "name": "string", "countryId": "category"},
+    "tyre-manufacturers": {"id": "string", "name": "string", "countryId": "category"},
+}
+
+def table_name(csv_file):
+    # data/f1db/f1db-engine-manufacturers.csv -> "engine-manufacturers"
+    name = os.path.basename(csv_file)[:-len(".csv")]
+    return name[len("f1db-"):] if name.startswith("f1db-") else name
+
+def _dtypes(name, csv_file):
+    columns = pd.read_csv(csv_file, nrows=0).columns
+    dtypes = {column: "string" for column in columns if column == "id"}
+    dtypes.update({column: "category" for column in columns if column.endswith("Id")})
+    dtypes.update(DTYPES.get(name, {}))
+    return {column: dtype for column, dtype in dtypes.items() if column in columns}
+
+class F1DB:
+    """
+    Lazily loaded, typed F1DB tables. Each CSV is parsed once into a Parquet cache that is
+    rebuilt only when the CSV is newer than the cache; within a process every table is
+    loaded at most once. Tables are shared between callers, so copy before modifying.
+
+        f1db = F1DB()
+        f1db.table("countries")      # or f1db.engine_manufacturers
+    """
+    def __init__(self, folder=F1DB_FOLDER, cache_folder=CACHE_FOLDER):
+        self.folder = folder
+        self.cache_folder = cache_folder
+        self._tables = {}
+
+    def load_csv(self, csv_file):
+        """
+        Typed DataFrame for any F1DB-style CSV path, served from the Parquet cache.
+        """
+        key = os.path.abspath(csv_file)
+        if key in self._tables:
+            return self._tables[key]
+
+        name = table_name(csv_file)
+        cache_file = os.path.join(self.cache_folder, f"{name}.parquet")
+        if os.path.exists(cache_file) and os.path.getmtime(cache_file) >= os.path.getmtime(csv_file):
+            df = pd.read_parquet(cache_file)
+        else:
+            df = pd.read_csv(csv_file, dtype=_dtypes(name, csv_file), low_memory=False)
+            os.makedirs(self.cache_folder, exist_ok=True)
+            tmp_file = f"{cache_file}.tmp"
+            df.to_parquet(tmp_file, index=False)
+            os.replace(tmp_file, cache_file)
+
+        self._tables[key] = df
+        return df
+
+    def table(self, name):
+        return self.load_csv(os.path.join(self.folder, f"f1db-{name}.csv"))
+
+    def __getattr__(self, attribute):
+        # f1db.races_race_results -> table("races-race-results")
+        if attribute.startswith("_"):
+            raise AttributeError(attribute)
+        csv_file = os.path.join(self.folder, f"f1db-{attribute.replace('_', '-')}.csv")
+        if not os.path.exists(csv_file):
+            raise AttributeError(f"No F1DB table {attribute} in {self.folder}")
+        return self.load_csv(csv_file)
+
+    def build_cache(self):
+        # Converts every CSV in the snapshot up front
+        for filename in sorted(os.listdir(self.folder)):
+            if filename.endswith(".csv"):
+                self.load_csv(os.path.join(self.folder, filename))
+        return sorted(self._tables)
+
+# Shared default instance
+f1db = F1DB()
+
+
+if __name__ == "__main__":
+    tables = f1db.build_cache()
+    print(f"Cached {len(tables)} F1DB tables in {f1db.cache_folder}")
@@ -1,8 +1,12 @@
 import pandas as pd
+import numpy as np
 import os
+import json
+import argparse
 from geopy.geocoders import Nominatim
 from geopy.distance import geodesic
 import logging
+from f1db import f1db
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -10,11 +14,84 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # Initialize the geolocator
 geolocator = Nominatim(user_agent="f1_supply_chain_optimizer")
 
+class GeocodeCacheMiss(LookupError):
+    """
+    Raised in offline mode for a query that is not in the geocode cache.
+    """
+
+class GeocodeCache:
+    """
+    Persistent geocoder: results are stored on disk keyed by the normalized query string,
+    so each distinct location is resolved over the network at most once. Failed lookups
+    (no match) are cached as None. In offline mode a cache miss raises GeocodeCacheMiss
+    instead of making a network call.
+    """
+    def __init__(self, cache_file="cache/geocode_cache.json", offline=False, geolocator=geolocator):
+        self.cache_file = cache_file
+        self.offline = offline
+        self.geolocator = geolocator
+        self.hits = 0
+        self.misses = 0
+        self.network_lookups = 0
+        self.entries = {}
+        if os.path.exists(cache_file):
+            with open(cache_file, encoding="utf-8") as file:
+                self.entries = json.load(file)
+
+    @staticmethod
+    def normalize(query):
+        # "united-states-of-america", "United States of America " -> "united states of america"
+        return " ".join(str(query).replace("-", " ").replace("_", " ").lower().split())
+
+    def geocode(self, query):
+        """
+        Returns (latitude, longitude) for query, or None if it cannot be resolved.
+        """
+        key = self.normalize(query)
+        if key in self.entries:
+            self.hits += 1
+            return tuple(self.entries[key]) if self.entries[key] else None
+
+        self.misses += 1
+        if self.offline:
+            raise GeocodeCacheMiss(f"Offline mode: no cached coordinates for {query}")
+
+        location = self.geolocator.geocode(query)
+        self.network_lookups += 1
+        self.entries[key] = [location.latitude, location.longitude] if location else None
+        self.save()
+        return tuple(self.entries[key]) if self.entries[key] else None
+
+    def missing(self, queries):
+        """
+        Distinct queries with no cache entry, in first-seen order.
+        """
+        keys = {}
+        for query in queries:
+            keys.setdefault(self.normalize(query), query)
+        return [query for key, query in keys.items() if key not in self.entries]
+
+    def save(self):
+        # Write to a temporary file first so an interrupted run never truncates the cache
+        os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            json.dump(self.entries, file, indent=1, sort_keys=True, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "network_lookups": self.network_lookups,
+        }
+
 # Function to add country names to manufacturers
 def map_countries(manufacturers_file, countries_file, output_file):
     logging.info(f"Mapping countries for {manufacturers_file}...")
-    manufacturers = pd.read_csv(manufacturers_file)
-    countries = pd.read_csv(countries_file)
+    manufacturers = f1db.load_csv(manufacturers_file)
+    countries = f1db.load_csv(countries_file)
 
     # Merge with country data to get country names
     manufacturers = manufacturers.merge(countries[['id', 'name']], left_on='countryId', right_on='id', how='left')
@@ -30,68 +107,109 @@ def map_countries(manufacturers_file, countries_file, output_file):
     return manufacturers
 
 # Function to add coordinates to manufacturers
-def add_coordinates(manufacturers_file, output_file):
+def add_coordinates(manufacturers_file, output_file, geocoder=None):
     logging.info(f"Adding coordinates for {manufacturers_file}...")
+    geocoder = geocoder or GeocodeCache()
     manufacturers = pd.read_csv(manufacturers_file)
-    manufacturers['Coordinates'] = None
-    
-    # Geocode each country
-    for index, row in manufacturers.iterrows():
+
+    # Geocode each distinct country once
+    countries = manufacturers['countryId'].dropna().unique()
+    coordinates = {}
+    for index, country in enumerate(countries):
         try:
-            logging.info(f"Geocoding country: {row['countryId']} ({index+1}/{len(manufacturers)})")
-            location = geolocator.geocode(row['countryId'])
+            logging.info(f"Geocoding country: {country} ({index+1}/{len(countries)})")
+            location = geocoder.geocode(country)
             if location:
-                manufacturers.at[index, 'Coordinates'] = f"{location.latitude},{location.longitude}"
+                coordinates[country] = f"{location[0]},{location[1]}"
             else:
-                logging.warning(f"Could not find coordinates for: {row['countryId']}")
+                logging.warning(f"Could not find coordinates for: {country}")
+        except GeocodeCacheMiss:
+            raise
         except Exception as e:
-            logging.error(f"Error geocoding {row['countryId']}: {e}")
+            logging.error(f"Error geocoding {country}: {e}")
+    manufacturers['Coordinates'] = manufacturers['countryId'].map(coordinates)
+    logging.info(f"Geocode cache stats: {geocoder.stats()}")
     
     # Save the updated file
     manufacturers.to_csv(output_file, index=False)
     logging.info(f"Coordinates added and saved to {output_file}.")
     return manufacturers
 
+# Mean Earth radius used by the haversine approximation
+EARTH_RADIUS_KM = 6371.0088
+
+def haversine_matrix(origins, destinations):
+    """
+    Great-circle distances in km between every (lat, lon) pair in origins (N) and
+    destinations (M), computed as one N x M array operation.
+    """
+    origins = np.radians(np.asarray(origins, dtype=float).reshape(-1, 2))
+    destinations = np.radians(np.asarray(destinations, dtype=float).reshape(-1, 2))
+    lat1, lon1 = origins[:, 0, None], origins[:, 1, None]
+    lat2, lon2 = destinations[None, :, 0], destinations[None, :, 1]
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+def distance_matrix(origins, destinations, exact=False):
+    """
+    Full origins x destinations distance matrix in km. The default is the vectorized
+    haversine (typically within 0.3% of the ellipsoid, 0.5% at worst); exact=True refines it with
+    the WGS-84 geodesic at Python speed, once per distinct coordinate pair.
+    """
+    matrix = haversine_matrix(origins, destinations)
+    if not exact:
+        return matrix
+    refined = {}
+    for i, origin in enumerate(origins):
+        for j, destination in enumerate(destinations):
+            # Coincident points are already exact; repeated pairs reuse the first geodesic
+            if matrix[i, j] > 0:
+                pair = (tuple(origin), tuple(destination))
+                if pair not in refined:
+                    refined[pair] = geodesic(origin, destination).km
+                matrix[i, j] = refined[pair]
+    return matrix
+
 # Function to calculate distances between races and manufacturers
-def calculate_distances(schedule_file, manufacturers_file, output_file):
+def calculate_distances(schedule_file, manufacturers_file, output_file, geocoder=None, exact=False):
     logging.info(f"Calculating distances from {manufacturers_file} to race locations in {schedule_file}...")
+    geocoder = geocoder or GeocodeCache()
     race_schedule = pd.read_csv(schedule_file)
     manufacturers = pd.read_csv(manufacturers_file)
     
     # Extract coordinates
-    race_schedule['Coordinates'] = race_schedule['Location'].apply(
-        lambda loc: geolocator.geocode(loc) and (geolocator.geocode(loc).latitude, geolocator.geocode(loc).longitude)
-    )
+    race_schedule['Coordinates'] = race_schedule['Location'].apply(geocoder.geocode)
     manufacturers['Coordinates'] = manufacturers['Coordinates'].apply(
         lambda coord: tuple(map(float, coord.strip('()').split(','))) if pd.notna(coord) else None
     )
     
-    results = []
-    for race_index, race in race_schedule.iterrows():
-        if not race['Coordinates']:
-            logging.warning(f"Skipping race {race['EventName']} as it has no coordinates.")
-            continue
-        
-        logging.info(f"Processing race: {race['EventName']} ({race_index+1}/{len(race_schedule)})")
-        race_coords = race['Coordinates']
-        race_result = {'Race': race['EventName']}
-        
-        for _, manufacturer in manufacturers.iterrows():
-            manu_coords = manufacturer['Coordinates']
-            if manu_coords:
-                distance = geodesic(race_coords, manu_coords).km
-                race_result[manufacturer['countryId']] = distance
-        
-        results.append(race_result)
+    for race_name in race_schedule.loc[race_schedule['Coordinates'].isna(), 'EventName']:
+        logging.warning(f"Skipping race {race_name} as it has no coordinates.")
+    races = race_schedule[race_schedule['Coordinates'].notna()]
+
+    # One column per manufacturer country with known coordinates
+    suppliers = manufacturers[manufacturers['Coordinates'].notna()].drop_duplicates('countryId')
+    
+    logging.info(f"Computing {len(races)} x {len(suppliers)} distance matrix...")
+    matrix = distance_matrix(list(races['Coordinates']), list(suppliers['Coordinates']), exact=exact)
     
     # Save results
-    results_df = pd.DataFrame(results)
+    results_df = pd.DataFrame(matrix, columns=suppliers['countryId'].values)
+    results_df.insert(0, 'Race', races['EventName'].values)
     results_df.to_csv(output_file, index=False)
     logging.info(f"Distance calculations saved to {output_file}.")
     return results_df
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Map F1DB manufacturers to countries, coordinates and race distances.")
+    parser.add_argument("--offline", action="store_true", help="Use only the geocode cache, never the network")
+    parser.add_argument("--geocode-cache", default="cache/geocode_cache.json")
+    parser.add_argument("--exact", action="store_true", help="Refine the haversine distances with WGS-84 geodesics (as in the bundled distance CSVs)")
+    args = parser.parse_args()
+
     logging.info("Starting F1 Supply Chain Optimization Script...")
+    geocoder = GeocodeCache(args.geocode_cache, offline=args.offline)
     
     # File paths
     countries_file = "data/f1db/f1db-countries.csv"
@@ -110,20 +228,30 @@ if __name__ == "__main__":
     constructors_distances_file = "data/constructors_distances.csv"
     engine_manufacturers_distances_file = "data/engine_manufacturers_distances.csv"
     tyre_manufacturers_distances_file = "data/tyre_manufacturers_distances.csv"
-    
+
+    # Offline runs check every lookup up front, so an incomplete cache fails before any output is written
+    if args.offline:
+        queries = list(pd.read_csv(race_schedule_file)['Location'])
+        for manufacturers_file in (constructors_file, engine_manufacturers_file, tyre_manufacturers_file):
+            queries.extend(f1db.load_csv(manufacturers_file)['countryId'].dropna())
+        missing = geocoder.missing(queries)
+        if missing:
+            parser.error(f"--offline: no cached coordinates in {args.geocode_cache} for {len(missing)} locations: {', '.join(map(str, missing))}")
+
     # Process constructors
     map_countries(constructors_file, countries_file, constructors_with_countries)
-    add_coordinates(constructors_with_countries, constructors_with_coordinates)
-    calculate_distances(race_schedule_file, constructors_with_coordinates, constructors_distances_file)
+    add_coordinates(constructors_with_countries, constructors_with_coordinates, geocoder)
+    calculate_distances(race_schedule_file, constructors_with_coordinates, constructors_distances_file, geocoder, exact=args.exact)
     
     # Process engine manufacturers
     map_countries(engine_manufacturers_file, countries_file, engine_manufacturers_with_countries)
-    add_coordinates(engine_manufacturers_with_countries, engine_manufacturers_with_coordinates)
-    calculate_distances(race_schedule_file, engine_manufacturers_with_coordinates, engine_manufacturers_distances_file)
+    add_coordinates(engine_manufacturers_with_countries, engine_manufacturers_with_coordinates, geocoder)
+    calculate_distances(race_schedule_file, engine_manufacturers_with_coordinates, engine_manufacturers_distances_file, geocoder, exact=args.exact)
     
     # Process tyre manufacturers
     map_countries(tyre_manufacturers_file, countries_file, tyre_manufacturers_with_countries)
-    add_coordinates(tyre_manufacturers_with_countries, tyre_manufacturers_with_coordinates)
-    calculate_distances(race_schedule_file, tyre_manufacturers_with_coordinates, tyre_manufacturers_distances_file)
+    add_coordinates(tyre_manufacturers_with_countries, tyre_manufacturers_with_coordinates, geocoder)
+    calculate_distances(race_schedule_file, tyre_manufacturers_with_coordinates, tyre_manufacturers_distances_file, geocoder, exact=args.exact)
     
+    logging.info(f"Geocode cache stats: {geocoder.stats()}")
     logging.info("Script execution complete.")
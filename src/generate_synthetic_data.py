@@ -1,7 +1,10 @@
 import pandas as pd
 import numpy as np
 import os
+import argparse
 from datetime import timedelta
+from telemetry_store import STORE_ROOT, load_pitstops
+from schedule_index import ScheduleIndex, normalize_event_key
 
 
 # Function to generate supply chain data with enhanced factors
@@ -13,12 +16,20 @@ def generate_supply_chain_data(
     tyre_distances_file,
     num_days,
     output_file,
+    num_scenarios=1,
+    seed=None,
 ):
+    """
+    Generates num_scenarios independent num_days supply chain simulations. Scenario k draws
+    from RandomState(seed + k), or from the global np.random stream when seed is None.
+    Several scenarios are written as one long-format table with a leading "scenario"
+    column; a .parquet output_file is written as Parquet, anything else as CSV.
+    """
     print("Generating supply chain data with enhanced factors...")
 
     # Load race schedule
-    race_schedule = pd.read_csv(race_schedule_file)
-    race_schedule["EventDate"] = pd.to_datetime(race_schedule["EventDate"])
+    schedule = ScheduleIndex.from_csv(race_schedule_file)
+    race_schedule = schedule.schedule
 
     # Load distance files
     constructors_distances = pd.read_csv(constructors_distances_file)
@@ -30,103 +41,123 @@ def generate_supply_chain_data(
     end_date = start_date + timedelta(days=num_days - 1)
     dates = pd.date_range(start=start_date, end=end_date, freq="D")
 
-    data = {
-        "day": range(1, num_days + 1),
-        "date": dates,
-        "inventory_level": np.random.randint(40, 60, num_days),
-        "demand": np.random.randint(1, 5, num_days),  # Add random baseline demand
-        "lead_time": np.random.randint(2, 5, num_days),
-        "transport_cost": np.random.uniform(50, 150, num_days),
-    }
-    df = pd.DataFrame(data)
-
-    # Add race-related demand spikes using telemetry
-    for _, race in race_schedule.iterrows():
-        race_date = race["EventDate"]
-        event_name = race["EventName"]
-        telemetry_file = os.path.join(
-            telemetry_folder, f"telemetry_{event_name.replace(' ', '_')}_pitstops.csv"
-        )
-
-        if os.path.exists(telemetry_file):
-            pit_stops = pd.read_csv(telemetry_file)
-            total_pit_stops = pit_stops["PitStopCount"].sum()  # Total pit stops in the race
-            if race_date in df["date"].values:
-                idx = df[df["date"] == race_date].index[0]
-                spike = total_pit_stops * np.random.randint(2, 5)
-                df.loc[idx, "demand"] += spike  # Scale demand by pit stops
-                print(
-                    f"Added demand spike of {spike} on {race_date} for {event_name} ({total_pit_stops} pit stops)."
-                )
-        else:
-            print(f"Telemetry file not found for {event_name}.")
+    # Date-indexed join: day index of each race inside the simulated window (NaN if outside)
+    day_index = pd.Series(np.arange(num_days), index=dates)
+    race_days = race_schedule["EventDate"].map(day_index)
+
+    # Total pit stops per race, read only for the scheduled races from the telemetry store
+    pit_stops = load_pitstops(
+        columns=["PitStopCount"], seasons=schedule.seasons, events=race_schedule["EventName"], store_root=telemetry_folder
+    )
+    pit_stops["Season"] = pit_stops["season"]
+    pit_stops["EventKey"] = pit_stops["event"].astype(str).map(normalize_event_key)
+    pit_stop_totals = pit_stops.groupby(["Season", "EventKey"])["PitStopCount"].sum().rename("PitStops")
+    race_pit_stops = race_schedule.join(pit_stop_totals, on=["Season", "EventKey"])["PitStops"]
+    for event_name in race_schedule.loc[race_pit_stops.isna(), "EventName"]:
+        print(f"Telemetry file not found for {event_name}.")
+
+    # Races that get a demand spike, in schedule order (one random multiplier each)
+    spikes = race_pit_stops.notna() & race_days.notna()
+    spike_days = race_days[spikes].to_numpy(dtype=int)
+    spike_pit_stops = race_pit_stops[spikes].to_numpy(dtype=int)
+
+    # Average constructor/engine/tyre distance per race drives transport cost and lead time
+    average_distance = (
+        constructors_distances.drop_duplicates("Race").set_index("Race").mean(axis=1)
+        + engine_distances.drop_duplicates("Race").set_index("Race").mean(axis=1)
+        + tyre_distances.drop_duplicates("Race").set_index("Race").mean(axis=1)
+    ) / 3
+    average_distance.index = average_distance.index.map(normalize_event_key)
+    race_distances = race_schedule["EventKey"].map(average_distance)
+    distance_races = race_distances.notna() & race_days.notna()
+    distance_days = race_days[distance_races].to_numpy(dtype=int)
+    distances = race_distances[distance_races].to_numpy()
+
+    # Random draws per scenario, in the same order as the original per-column generation
+    shape = (num_scenarios, num_days)
+    inventory_level = np.empty(shape, dtype=int)
+    demand = np.empty(shape, dtype=int)
+    lead_time = np.empty(shape, dtype=float)
+    transport_cost = np.empty(shape, dtype=float)
+    spike_multipliers = np.empty((num_scenarios, len(spike_days)), dtype=int)
+    for scenario in range(num_scenarios):
+        rng = np.random if seed is None else np.random.RandomState(seed + scenario)
+        inventory_level[scenario] = rng.randint(40, 60, num_days)
+        demand[scenario] = rng.randint(1, 5, num_days)  # Add random baseline demand
+        lead_time[scenario] = rng.randint(2, 5, num_days)
+        transport_cost[scenario] = rng.uniform(50, 150, num_days)
+        spike_multipliers[scenario] = rng.randint(2, 5, len(spike_days))
+
+    # Add race-related demand spikes using telemetry (scaled by pit stops)
+    np.add.at(demand, (slice(None), spike_days), spike_pit_stops * spike_multipliers)
+    print(f"Added {len(spike_days)} race demand spikes per scenario.")
 
     # Adjust transport cost and lead time based on distances
-    for _, race in race_schedule.iterrows():
-        race_event = race["EventName"]
-
-        if race_event in constructors_distances["Race"].values:
-            cons_distance = constructors_distances.loc[
-                constructors_distances["Race"] == race_event
-            ]
-            engine_distance = engine_distances.loc[
-                engine_distances["Race"] == race_event
-            ]
-            tyre_distance = tyre_distances.loc[
-                tyre_distances["Race"] == race_event
-            ]
-
-            # Modify transport cost and lead time
-            average_distance = (
-                cons_distance.iloc[0, 1:].mean()
-                + engine_distance.iloc[0, 1:].mean()
-                + tyre_distance.iloc[0, 1:].mean()
-            ) / 3
-
-            df.loc[
-                df["date"].isin([race["EventDate"]]), "transport_cost"
-            ] += average_distance * 0.2
-            df.loc[
-                df["date"].isin([race["EventDate"]]), "lead_time"
-            ] += average_distance * 0.01  # Assume 1% of distance adds to lead time
+    np.add.at(transport_cost, (slice(None), distance_days), distances * 0.2)
+    np.add.at(lead_time, (slice(None), distance_days), distances * 0.01)  # Assume 1% of distance adds to lead time
 
     # Simulate inventory and replenishment
     min_inventory = 10
     replenishment_amount =  100
-    df["remaining_inventory"] = df["inventory_level"] - df["demand"]
-    df["replenishment"] = df["remaining_inventory"].apply(
-        lambda x: replenishment_amount if x < min_inventory else 0
-    )
-
-    # Simulate delayed replenishment
-    df["delayed_replenishment"] = 0
-    for i in range(len(df)):
-        lead_time = int(df.loc[i, "lead_time"])  # Explicitly cast lead_time to an integer
-        if i + lead_time < len(df):
-            df.loc[i + lead_time, "delayed_replenishment"] += df.loc[i, "replenishment"]
-
-
-    df["inventory_level"] = df["remaining_inventory"] + df["delayed_replenishment"]
-
-    # Save to CSV
+    remaining_inventory = inventory_level - demand
+    replenishment = np.where(remaining_inventory < min_inventory, replenishment_amount, 0)
+
+    # Simulate delayed replenishment: scatter-add each order lead_time days later
+    arrival_day = np.arange(num_days) + lead_time.astype(int)
+    arrives = arrival_day < num_days
+    scenario_rows = np.broadcast_to(np.arange(num_scenarios)[:, None], shape)
+    delayed_replenishment = np.zeros(shape, dtype=int)
+    np.add.at(delayed_replenishment, (scenario_rows[arrives], arrival_day[arrives]), replenishment[arrives])
+
+    inventory_level = remaining_inventory + delayed_replenishment
+
+    # Long format: one row per (scenario, day)
+    df = pd.DataFrame({
+        "day": np.tile(np.arange(1, num_days + 1), num_scenarios),
+        "date": np.tile(dates, num_scenarios),
+        "inventory_level": inventory_level.ravel(),
+        "demand": demand.ravel(),
+        "lead_time": lead_time.ravel(),
+        "transport_cost": transport_cost.ravel(),
+        "remaining_inventory": remaining_inventory.ravel(),
+        "replenishment": replenishment.ravel(),
+        "delayed_replenishment": delayed_replenishment.ravel(),
+    })
+    if num_scenarios > 1:
+        df.insert(0, "scenario", np.repeat(np.arange(num_scenarios), num_days))
+
+    # Save to CSV (or Parquet)
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    df.to_csv(output_file, index=False)
+    if output_file.endswith(".parquet"):
+        df.to_parquet(output_file, index=False)
+    else:
+        df.to_csv(output_file, index=False)
     print(f"Supply chain data saved to {output_file}")
+    return df
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic supply chain data.")
+    parser.add_argument("--scenarios", type=int, default=1, help="Number of seeded scenarios in one long-format table")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--output", default="data/supply_chain_data_with_distances.csv")
+    args = parser.parse_args()
+
     race_schedule_file = "data/f1_race_schedule.csv"
-    telemetry_folder = "data"
+    telemetry_folder = STORE_ROOT
     constructors_distances_file = "data/constructors_distances.csv"
     engine_distances_file = "data/engine_manufacturers_distances.csv"
     tyre_distances_file = "data/tyre_manufacturers_distances.csv"
-    output_file = "data/supply_chain_data_with_distances.csv"
+    output_file = args.output
     generate_supply_chain_data(
         race_schedule_file,
         telemetry_folder,
         constructors_distances_file,
         engine_distances_file,
         tyre_distances_file,
-        180,
+        args.days,
         output_file,
+        num_scenarios=args.scenarios,
+        seed=args.seed,
     )
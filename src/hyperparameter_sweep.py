@@ -0,0 +1,182 @@
+import sys
+import os
+import json
+import time
+import hashlib
+import argparse
+import itertools
+import multiprocessing
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from environment.rl_environment import SupplyChainEnvironment
+from rl_agent import RLAgent
+from train_rl_agent import train_agent
+from policy_evaluation import evaluate_chunk
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+CACHE_DIR = "cache/sweeps"
+# Bump when training or evaluation changes so stale cached results are not reused
+CACHE_VERSION = 1
+
+ENV_KWARGS = dict(
+    data_file="data/final_processed_data.csv",
+    distances_file="data/constructors_distances.csv",
+    max_days=180,
+    max_inventory=500,
+)
+
+# Hyperparameters a configuration may set; anything missing takes the RLAgent default
+DEFAULTS = {"alpha": 0.3, "gamma": 0.95, "epsilon_decay": 0.99, "epsilon_min": 0.1, "episodes": 1000, "seed": 0}
+
+def grid(space):
+    """
+    Every combination of the value lists in space, e.g. {"alpha": [0.1, 0.3], "gamma": [0.9]}.
+    """
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+def random_configs(space, count, seed=0):
+    """
+    count configurations drawn from space: a list is sampled from, a (low, high) tuple is
+    sampled uniformly (as an int when both bounds are ints).
+    """
+    rng = np.random.RandomState(seed)
+    configs = []
+    for _ in range(count):
+        config = {}
+        for name in sorted(space):
+            values = space[name]
+            if isinstance(values, tuple):
+                low, high = values
+                config[name] = int(rng.randint(low, high + 1)) if isinstance(low, int) and isinstance(high, int) else float(rng.uniform(low, high))
+            else:
+                config[name] = values[rng.randint(len(values))]
+        configs.append(config)
+    return configs
+
+def config_hash(config):
+    # Stable key: the full configuration (defaults filled in) plus the cache version
+    full = {**DEFAULTS, **config, "version": CACHE_VERSION}
+    return hashlib.sha256(json.dumps(full, sort_keys=True).encode()).hexdigest()[:16]
+
+def _cache_file(cache_dir, config, eval_rollouts):
+    # The evaluation budget is part of the key: a different rollout count is a new result
+    return os.path.join(cache_dir, f"{config_hash({**config, 'eval_rollouts': eval_rollouts})}.json")
+
+def run_config(config, eval_rollouts=1_000):
+    """
+    Trains one seeded agent with config and scores its greedy policy over eval_rollouts
+    Monte-Carlo rollouts.
+    """
+    full = {**DEFAULTS, **config}
+    env = SupplyChainEnvironment(**ENV_KWARGS, precompiled=True, seed=full["seed"])
+    agent = RLAgent(
+        state_size=env.state_size,
+        action_size=11,
+        alpha=full["alpha"],
+        gamma=full["gamma"],
+        epsilon_min=full["epsilon_min"],
+        epsilon_decay=full["epsilon_decay"],
+        seed=full["seed"],
+        dtype=np.float32,
+    )
+    start = time.perf_counter()
+    train_agent(env, agent, full["episodes"], rewards_file=None, log_every=full["episodes"] + 1)
+    train_seconds = time.perf_counter() - start
+    evaluation = evaluate_chunk(env, agent.greedy_policy(), eval_rollouts, full["seed"]).summary()
+    return {
+        **full,
+        "eval_reward_mean": evaluation["reward_mean"],
+        "eval_reward_p5": evaluation["reward_p5"],
+        "eval_stockout_day_rate": evaluation["stockout_day_rate"],
+        "train_seconds": train_seconds,
+        "episodes_per_sec": full["episodes"] / train_seconds,
+    }
+
+def _init_sweep_worker():
+    logging.getLogger().setLevel(logging.WARNING)
+
+def _run_sweep_worker(args):
+    config, eval_rollouts, cache_dir = args
+    result = run_config(config, eval_rollouts)
+    # Cache each point as soon as it finishes, so an interrupted sweep keeps its progress
+    cache_file = _cache_file(cache_dir, config, eval_rollouts)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "w") as file:
+        json.dump(result, file)
+    os.replace(tmp_file, cache_file)
+    return result
+
+def run_sweep(configs, num_workers=None, eval_rollouts=1_000, cache_dir=CACHE_DIR):
+    """
+    Runs every configuration not already cached in cache_dir on a process pool and returns
+    all results ranked by mean evaluation reward (ties: faster training first).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    results, pending = [], []
+    for config in {config_hash(config): config for config in configs}.values():
+        cache_file = _cache_file(cache_dir, config, eval_rollouts)
+        if os.path.exists(cache_file):
+            with open(cache_file) as file:
+                results.append(json.load(file))
+        else:
+            pending.append(config)
+    logging.info(f"{len(results)} configurations cached, {len(pending)} to run.")
+
+    if pending:
+        num_workers = min(num_workers or os.cpu_count() or 1, len(pending))
+        # Largest jobs first so the pool is not left waiting on one long tail
+        jobs = [(config, eval_rollouts, cache_dir) for config in pending]
+        jobs.sort(key=lambda job: -job[0].get("episodes", DEFAULTS["episodes"]))
+        with multiprocessing.Pool(num_workers, initializer=_init_sweep_worker) as pool:
+            for done, result in enumerate(pool.imap_unordered(_run_sweep_worker, jobs), start=1):
+                logging.info(
+                    f"[{done}/{len(jobs)}] reward {result['eval_reward_mean']:.1f} "
+                    f"in {result['train_seconds']:.1f}s for {({name: result[name] for name in DEFAULTS})}"
+                )
+                results.append(result)
+
+    table = pd.DataFrame(results)
+    table = table.sort_values(["eval_reward_mean", "train_seconds"], ascending=[False, True]).reset_index(drop=True)
+    table.index += 1
+    table.index.name = "rank"
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grid or random hyperparameter search for the RL agent.")
+    parser.add_argument("--alpha", type=float, nargs="+", default=[0.1, 0.3])
+    parser.add_argument("--gamma", type=float, nargs="+", default=[0.9, 0.95])
+    parser.add_argument("--epsilon-decay", type=float, nargs="+", default=[0.99, 0.999])
+    parser.add_argument("--epsilon-min", type=float, nargs="+", default=[0.1])
+    parser.add_argument("--episodes", type=int, nargs="+", default=[200])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--random", type=int, default=0, help="Sample N configurations from the lists instead of the full grid")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument("--eval-rollouts", type=int, default=1_000)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--output", default="models/sweep_results.csv")
+    args = parser.parse_args()
+
+    space = {
+        "alpha": args.alpha,
+        "gamma": args.gamma,
+        "epsilon_decay": args.epsilon_decay,
+        "epsilon_min": args.epsilon_min,
+        "episodes": args.episodes,
+        "seed": args.seeds,
+    }
+    configs = random_configs(space, args.random) if args.random > 0 else grid(space)
+    table = run_sweep(configs, args.workers, args.eval_rollouts, args.cache_dir)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    table.to_csv(args.output)
+    columns = ["alpha", "gamma", "epsilon_decay", "epsilon_min", "episodes", "seed", "eval_reward_mean", "train_seconds"]
+    print(table[columns].head(20).to_string())
+    logging.info(f"Sweep results saved to {args.output}")
@@ -0,0 +1,133 @@
+import os
+import numpy as np
+from environment.rl_environment import INVENTORY_BUCKETS
+from rl_agent import GreedyPolicy
+
+class TileCodingAgent:
+    """
+    Linear Q-function over tile-coded features, with the RLAgent interface (integer
+    states, actions -5..+5). A state is decoded into (inventory, day, demand, transport
+    cost), each scaled to [0, 1], and covered by num_tilings offset grids of tiles^4
+    tiles; Q(s, a) is the sum of one weight per tiling. Neighbouring inventory levels and
+    days share tiles, so one update generalizes to them, and the weight table has a fixed
+    size no matter how many days or inventory buckets the environment has.
+
+    day_features: (max_days, 2) array of normalized demand and transport cost per day.
+    """
+    def __init__(self, day_features, action_size=11, num_tilings=8, tiles=8, alpha=0.1, gamma=0.95, epsilon=1, epsilon_min=0.1, epsilon_decay=0.99, seed=None, dtype=np.float64):
+        self.day_features = np.asarray(day_features, dtype=np.float64)
+        self.max_days = len(self.day_features)
+        self.action_size = action_size
+        self.num_tilings = num_tilings
+        self.tiles = tiles
+        self.alpha = alpha  # Learning rate, shared across the active tiles
+        self.gamma = gamma
+        self.epsilon = epsilon
+        self.epsilon_min = epsilon_min
+        self.epsilon_decay = epsilon_decay
+        self.rng = np.random if seed is None else np.random.RandomState(seed)
+
+        # Tiling t is shifted by t / num_tilings of a tile along (1, 3, 5, 7), the usual
+        # asymmetric offsets; one extra tile per dimension absorbs the shift
+        self.offsets = np.outer(np.arange(num_tilings), [1, 3, 5, 7]) / num_tilings % 1
+        self.tiling_size = (tiles + 1) ** 4
+        self.strides = (tiles + 1) ** np.arange(4)
+        self.weights = np.zeros((num_tilings * self.tiling_size, action_size), dtype=dtype)
+
+    @classmethod
+    def from_env(cls, env, **kwargs):
+        return cls(np.column_stack([env.demand_array[:env.max_days], env.transport_cost_array[:env.max_days]]), **kwargs)
+
+    @property
+    def state_size(self):
+        return self.max_days * INVENTORY_BUCKETS
+
+    def features(self, states):
+        """
+        Active tile per tiling for an array of states, shape (len(states), num_tilings).
+        """
+        days, buckets = np.divmod(np.asarray(states, dtype=np.int64), INVENTORY_BUCKETS)
+        days = np.clip(days, 0, self.max_days - 1)
+        scaled = np.column_stack([
+            (buckets + 0.5) / INVENTORY_BUCKETS,
+            days / max(self.max_days - 1, 1),
+            np.clip(self.day_features[days], 0, 1),
+        ]) * self.tiles
+        coords = np.floor(scaled[:, None, :] + self.offsets).astype(np.int64)
+        return coords @ self.strides + np.arange(self.num_tilings) * self.tiling_size
+
+    def q_values(self, states):
+        return self.weights[self.features(states)].sum(axis=1)
+
+    def choose_action(self, state):
+        # Epsilon-greedy action selection
+        if self.rng.rand() < self.epsilon:
+            return self.rng.randint(-5, 5)
+        return np.argmax(self.q_values([state])[0]) - 5
+
+    def choose_actions(self, states):
+        states = np.asarray(states)
+        greedy = np.argmax(self.q_values(states), axis=1) - 5
+        explore = self.rng.rand(len(states)) < self.epsilon
+        random_actions = self.rng.randint(-5, 5, size=len(states))
+        return np.where(explore, random_actions, greedy)
+
+    def learn(self, state, action, reward, next_state):
+        # Semi-gradient Q-learning step on the active tiles
+        tiles = self.features([state, next_state])
+        action_idx = action + 5
+        td_target = reward + self.gamma * self.weights[tiles[1]].sum(axis=0).max()
+        td_error = td_target - self.weights[tiles[0], action_idx].sum()
+        self.weights[tiles[0], action_idx] += self.alpha / self.num_tilings * td_error
+
+        self._decay_epsilon()
+        return td_error
+
+    def learn_batch(self, states, actions, rewards, next_states):
+        """
+        learn for a batch of transitions against the same weight snapshot; updates to shared
+        tiles accumulate. Epsilon decays once per batch.
+        """
+        tiles = self.features(states)
+        action_idx = np.asarray(actions) + 5
+        td_target = np.asarray(rewards) + self.gamma * np.max(self.q_values(next_states), axis=1)
+        td_error = td_target - self.weights[tiles, action_idx[:, None]].sum(axis=1)
+        updates = np.repeat(self.alpha / self.num_tilings * td_error, self.num_tilings)
+        np.add.at(self.weights, (tiles.ravel(), np.repeat(action_idx, self.num_tilings)), updates)
+
+        self._decay_epsilon()
+        return td_error
+
+    def _decay_epsilon(self):
+        self.epsilon = max(self.epsilon * self.epsilon_decay, self.epsilon_min)
+
+    def greedy_policy(self):
+        # Evaluates every state once; works with env.rollout and policy_evaluation
+        return GreedyPolicy((np.argmax(self.q_values(np.arange(self.state_size)), axis=1) - 5).astype(np.int8))
+
+    def save_model(self, file_path):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        np.savez(
+            file_path,
+            weights=self.weights,
+            day_features=self.day_features,
+            config=np.array([self.num_tilings, self.tiles]),
+            hyperparameters=np.array([self.alpha, self.gamma]),
+        )
+        print(f"Model saved to {file_path}")
+
+    @classmethod
+    def load_model(cls, file_path):
+        if not os.path.exists(file_path):
+            print(f"Model file not found at {file_path}")
+            return None
+        with np.load(file_path) as data:
+            num_tilings, tiles = data["config"].tolist()
+            alpha, gamma = data["hyperparameters"].tolist()
+            weights = data["weights"]
+            agent = cls(
+                data["day_features"], weights.shape[1], num_tilings, tiles, alpha=alpha, gamma=gamma, dtype=weights.dtype
+            )
+        agent.weights = weights
+        print(f"Model loaded from {file_path}")
+        return agent
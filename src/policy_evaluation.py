@@ -0,0 +1,215 @@
+import sys
+import os
+import json
+import argparse
+import multiprocessing
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from environment.rl_environment import SupplyChainEnvironment, INVENTORY_BUCKETS
+from rl_agent import RLAgent, GreedyPolicy
+from linear_agent import TileCodingAgent
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+STOCKOUT_REWARD = -1000  # compute_reward's stockout penalty
+
+MODEL_FILE = "models/trained_rl_agent.npy"
+POLICY_FILE = "models/greedy_policy.npy"  # Greedy policy exported from MODEL_FILE by train_rl_agent.py
+
+class RolloutStats:
+    """
+    Streaming aggregate of many rollouts. Memory is bounded by the number of distinct
+    episode totals and INVENTORY_BUCKETS, not by the number of rollouts: totals are kept
+    as exact value counts (the per-day rewards are a handful of fixed values) and
+    end-of-day inventory as a histogram.
+    """
+    def __init__(self):
+        self.rollouts = 0
+        self.days = 0
+        self.reward_sum = 0.0
+        self.reward_sq_sum = 0.0
+        self.reward_counts = {}
+        self.stockout_days = 0
+        self.stockout_rollouts = 0
+        self.inventory_histogram = np.zeros(INVENTORY_BUCKETS, dtype=np.int64)
+
+    def add(self, rewards, inventory_after):
+        # rewards, inventory_after: (rollouts, days) arrays for one chunk
+        totals = rewards.sum(axis=1)
+        stockouts = rewards == STOCKOUT_REWARD
+        self.rollouts += len(totals)
+        self.days += rewards.size
+        self.reward_sum += float(totals.sum())
+        self.reward_sq_sum += float(np.square(totals, dtype=np.float64).sum())
+        for value, count in zip(*np.unique(totals, return_counts=True)):
+            self.reward_counts[value.item()] = self.reward_counts.get(value.item(), 0) + int(count)
+        self.stockout_days += int(stockouts.sum())
+        self.stockout_rollouts += int(stockouts.any(axis=1).sum())
+        buckets = np.clip((inventory_after * INVENTORY_BUCKETS).astype(np.int64), 0, INVENTORY_BUCKETS - 1)
+        self.inventory_histogram += np.bincount(buckets.ravel(), minlength=INVENTORY_BUCKETS)
+
+    def merge(self, other):
+        self.rollouts += other.rollouts
+        self.days += other.days
+        self.reward_sum += other.reward_sum
+        self.reward_sq_sum += other.reward_sq_sum
+        for value, count in other.reward_counts.items():
+            self.reward_counts[value] = self.reward_counts.get(value, 0) + count
+        self.stockout_days += other.stockout_days
+        self.stockout_rollouts += other.stockout_rollouts
+        self.inventory_histogram += other.inventory_histogram
+
+    def reward_percentile(self, q):
+        # Inverted-CDF percentile over the exact value counts (numpy method="inverted_cdf")
+        values = np.array(sorted(self.reward_counts))
+        cumulative = np.cumsum([self.reward_counts[value] for value in values])
+        rank = max(int(np.ceil(q / 100 * self.rollouts)), 1)
+        return values[np.searchsorted(cumulative, rank)].item()
+
+    def inventory_percentile(self, q):
+        # Lower edge of the inventory bucket holding the q-th percentile
+        cumulative = np.cumsum(self.inventory_histogram)
+        rank = max(int(np.ceil(q / 100 * self.days)), 1)
+        return np.searchsorted(cumulative, rank) / INVENTORY_BUCKETS
+
+    def summary(self, confidence_z=1.96):
+        mean = self.reward_sum / self.rollouts
+        variance = max(self.reward_sq_sum / self.rollouts - mean ** 2, 0.0) * self.rollouts / max(self.rollouts - 1, 1)
+        half_width = confidence_z * np.sqrt(variance / self.rollouts)
+        bucket_centers = (np.arange(INVENTORY_BUCKETS) + 0.5) / INVENTORY_BUCKETS
+        return {
+            "rollouts": self.rollouts,
+            "reward_mean": mean,
+            "reward_std": float(np.sqrt(variance)),
+            "reward_ci_low": mean - half_width,
+            "reward_ci_high": mean + half_width,
+            "reward_min": min(self.reward_counts),
+            "reward_p5": self.reward_percentile(5),
+            "reward_p25": self.reward_percentile(25),
+            "reward_p50": self.reward_percentile(50),
+            "reward_p75": self.reward_percentile(75),
+            "reward_p95": self.reward_percentile(95),
+            "reward_max": max(self.reward_counts),
+            "stockout_day_rate": self.stockout_days / self.days,
+            "stockout_rollout_rate": self.stockout_rollouts / self.rollouts,
+            "inventory_mean": float(bucket_centers @ self.inventory_histogram / self.days),
+            "inventory_p5": self.inventory_percentile(5),
+            "inventory_p50": self.inventory_percentile(50),
+            "inventory_p95": self.inventory_percentile(95),
+            "inventory_histogram": (self.inventory_histogram / self.days).tolist(),
+        }
+
+def evaluate_chunk(env, policy, num_rollouts, seed):
+    """
+    num_rollouts rollouts of policy as array lanes, with demand noise from RandomState(seed).
+    policy is anything with choose_actions (GreedyPolicy, or RLAgent for epsilon-greedy).
+    """
+    rng = np.random.RandomState(seed)
+    states = np.broadcast_to(env.episode_states(), (num_rollouts, env.max_days))
+    actions = np.asarray(policy.choose_actions(states.ravel())).reshape(states.shape)
+    rewards, inventory_after = env.simulate_days(actions, rng.uniform(0.95, 1.05, size=states.shape))
+    stats = RolloutStats()
+    stats.add(rewards, inventory_after)
+    return stats
+
+_worker_env = None
+_worker_policy = None
+
+def _init_evaluation_worker(env_kwargs, policy):
+    global _worker_env, _worker_policy
+    _worker_env = SupplyChainEnvironment(**env_kwargs, precompiled=True)
+    _worker_policy = policy
+
+def _run_evaluation_worker(args):
+    num_rollouts, seed = args
+    return evaluate_chunk(_worker_env, _worker_policy, num_rollouts, seed)
+
+def evaluate_policy(env_kwargs, policy, num_rollouts=10_000, chunk_size=1_000, seed=0, num_workers=0):
+    """
+    Monte-Carlo evaluation over num_rollouts seeded rollouts, processed in chunks of
+    chunk_size array lanes (in worker processes when num_workers > 0). Chunk i uses seed
+    + i, so results depend only on seed and chunk_size, not on the worker count.
+    Returns the RolloutStats summary dict.
+    """
+    chunks = [
+        (min(chunk_size, num_rollouts - start), seed + index)
+        for index, start in enumerate(range(0, num_rollouts, chunk_size))
+    ]
+    stats = RolloutStats()
+    if num_workers > 0:
+        with multiprocessing.Pool(num_workers, initializer=_init_evaluation_worker, initargs=(env_kwargs, policy)) as pool:
+            # Ordered results keep the float sums identical across worker counts
+            for chunk_stats in pool.imap(_run_evaluation_worker, chunks):
+                stats.merge(chunk_stats)
+    else:
+        env = SupplyChainEnvironment(**env_kwargs, precompiled=True)
+        for chunk_rollouts, chunk_seed in chunks:
+            stats.merge(evaluate_chunk(env, policy, chunk_rollouts, chunk_seed))
+    return stats.summary()
+
+def load_policy(model_file=MODEL_FILE, policy_file=None, mmap=False):
+    """
+    Greedy policy of the model in model_file (a dense Q-table or a tile-coding agent). An
+    exported policy_file is used only when it is at least as new as the model; a stale one
+    is ignored with a warning and the policy is rebuilt from the model. Returns None if
+    the model does not exist.
+    """
+    if policy_file and os.path.exists(policy_file):
+        if os.path.exists(model_file) and os.path.getmtime(policy_file) < os.path.getmtime(model_file):
+            logging.warning(f"{policy_file} is older than {model_file}; rebuilding the policy from the model.")
+        else:
+            return GreedyPolicy.load(policy_file, mmap=mmap)
+
+    if model_file.endswith(".npz"):
+        if not os.path.exists(model_file):
+            print(f"Model file not found at {model_file}")
+            return None
+        with np.load(model_file) as data:
+            is_tile_agent = "weights" in data.files
+        if not is_tile_agent:
+            raise ValueError(f"{model_file} holds a sparse --rich-state Q-table, which needs the rich state encoding to evaluate")
+        agent = TileCodingAgent.load_model(model_file)
+    else:
+        agent = RLAgent.load_model(model_file, mmap=mmap)
+    return agent.greedy_policy() if agent else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte-Carlo evaluation of the trained policy.")
+    parser.add_argument("--rollouts", type=int, default=10_000)
+    parser.add_argument("--chunk-size", type=int, default=1_000, help="Rollouts simulated together as array lanes")
+    parser.add_argument("--workers", type=int, default=0, help="Evaluate chunks in N worker processes (0 = in process)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", default=MODEL_FILE, help="Trained model to evaluate (.npy Q-table or tile-coding .npz)")
+    parser.add_argument("--policy", default=None, help=f"Exported greedy policy of --model (default: {POLICY_FILE} for {MODEL_FILE})")
+    parser.add_argument("--output", default="models/evaluation_summary.json")
+    args = parser.parse_args()
+
+    env_kwargs = dict(
+        data_file="data/final_processed_data.csv",
+        distances_file="data/constructors_distances.csv",
+        max_days=180,
+        max_inventory=500,
+    )
+
+    policy_file = args.policy or (POLICY_FILE if args.model == MODEL_FILE else None)
+    policy = load_policy(args.model, policy_file)
+    if policy is None:
+        logging.error("Trained agent file not found. Please train the agent first.")
+        sys.exit(1)
+
+    summary = evaluate_policy(env_kwargs, policy, args.rollouts, args.chunk_size, args.seed, args.workers)
+    logging.info(
+        f"{summary['rollouts']} rollouts: reward {summary['reward_mean']:.1f} "
+        f"(95% CI {summary['reward_ci_low']:.1f} to {summary['reward_ci_high']:.1f}, "
+        f"p5 {summary['reward_p5']}, p50 {summary['reward_p50']}, p95 {summary['reward_p95']}), "
+        f"stockout days {summary['stockout_day_rate']:.2%}, mean inventory {summary['inventory_mean']:.3f}"
+    )
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump(summary, file, indent=2)
+    logging.info(f"Evaluation summary saved to {args.output}")
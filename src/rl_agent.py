@@ -1,27 +1,54 @@
 import numpy as np
 import pickle
 import os
+from sparse_q_table import SparseQTable
+
+def _write_atomic(file_path, write):
+    # Writes through write(file) into a temporary file next to file_path, then renames it
+    # into place: readers that memory-mapped the old file keep reading the old contents
+    # instead of a truncated or rewritten file
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    tmp_file = f"{file_path}.tmp"
+    with open(tmp_file, 'wb') as file:
+        write(file)
+    os.replace(tmp_file, file_path)
 
 class RLAgent:
-    def __init__(self, state_size, action_size, alpha=0.1, gamma=0.95, epsilon=1, epsilon_min=0.1, epsilon_decay=0.99):
+    def __init__(self, state_size, action_size, alpha=0.3, gamma=0.95, epsilon=1, epsilon_min=0.1, epsilon_decay=0.99, seed=None, dtype=np.float64, sparse=False):
         self.state_size = state_size
         self.action_size = action_size
-        self.alpha = 0.3  # Learning rate
+        self.alpha = alpha  # Learning rate
         self.gamma = gamma  # Discount factor
         self.epsilon = epsilon  # Initial exploration rate
         self.epsilon_min = epsilon_min  # Minimum exploration rate
-        self.epsilon_decay = 0.99  # Decay factor for epsilon
+        self.epsilon_decay = epsilon_decay  # Decay factor for epsilon
+
+        # Exploration RNG; unseeded agents share the global np.random stream
+        self.rng = np.random if seed is None else np.random.RandomState(seed)
 
-        # Initialize Q-table
-        self.q_table = np.zeros((state_size, action_size))
+        # Initialize Q-table; sparse=True only allocates visited states (for large encodings)
+        if sparse:
+            self.q_table = SparseQTable(action_size, dtype=dtype, state_size=state_size)
+        else:
+            self.q_table = np.zeros((state_size, action_size), dtype=dtype)
 
     def choose_action(self, state):
         # Epsilon-greedy action selection
-        if np.random.rand() < self.epsilon:
-            return np.random.randint(-5, 5)  # Adjust inventory by -5 to +5 units
+        if self.rng.rand() < self.epsilon:
+            return self.rng.randint(-5, 5)  # Adjust inventory by -5 to +5 units
         else:
             return np.argmax(self.q_table[state])- 5  # Offset to handle negative adjustments
 
+    def choose_actions(self, states):
+        """
+        Epsilon-greedy selection for an array of states in one call.
+        """
+        states = np.asarray(states)
+        greedy = np.argmax(self.q_table[states], axis=1) - 5
+        explore = self.rng.rand(len(states)) < self.epsilon
+        random_actions = self.rng.randint(-5, 5, size=len(states))
+        return np.where(explore, random_actions, greedy)
+
     def learn(self, state, action, reward, next_state):
         action_idx = action + 5  # Shift action space to positive index range
         best_next_action = np.argmax(self.q_table[next_state])
@@ -31,26 +58,122 @@ class RLAgent:
 
         # Decay epsilon after learning
         self._decay_epsilon()
+        return td_error
+
+    def learn_batch(self, states, actions, rewards, next_states):
+        """
+        Applies the learn update to a whole batch of transitions against the same Q-table snapshot.
+        Duplicate (state, action) pairs are averaged into a single update rather than overwriting
+        each other, and epsilon decays once per batch.
+        """
+        states = np.asarray(states)
+        action_idx = np.asarray(actions) + 5  # Shift action space to positive index range
+        td_target = np.asarray(rewards) + self.gamma * np.max(self.q_table[next_states], axis=1)
+        current = self.q_table[states, action_idx]
+        td_error = td_target - current
+        updates = self.alpha * (0.7 * td_error + 0.3 * current)
+
+        # Accumulate per (state, action) so duplicates all contribute
+        flat_idx = states * self.action_size + action_idx
+        unique_idx, inverse = np.unique(flat_idx, return_inverse=True)
+        totals = np.bincount(inverse, weights=updates, minlength=len(unique_idx))
+        counts = np.bincount(inverse, minlength=len(unique_idx))
+        unique_states, unique_actions = np.divmod(unique_idx, self.action_size)
+        self.q_table[unique_states, unique_actions] += totals / counts
+
+        # Decay epsilon after learning
+        self._decay_epsilon()
+        return td_error
+
+    def greedy_policy(self):
+        if isinstance(self.q_table, SparseQTable):
+            return GreedyPolicy.from_sparse(self.q_table)
+        return GreedyPolicy.from_q_table(self.q_table)
 
     def _decay_epsilon(self):
         # Reduce epsilon by the decay factor but ensure it doesn't go below epsilon_min
         self.epsilon = max(self.epsilon * self.epsilon_decay, self.epsilon_min)
 
     def save_model(self, file_path):
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'wb') as file:
-            pickle.dump(self.q_table, file)
+        # .pkl keeps the legacy pickle format, .npy is a raw array and a sparse table is
+        # written as .npz (keys and rows). The suffix is required, so the file load_model
+        # looks for is exactly file_path
+        if isinstance(self.q_table, SparseQTable):
+            if not file_path.endswith('.npz'):
+                raise ValueError(f"A sparse Q-table is saved as .npz, got {file_path}")
+            _write_atomic(file_path, self.q_table.save)
+        elif file_path.endswith('.pkl'):
+            _write_atomic(file_path, lambda file: pickle.dump(self.q_table, file))
+        elif file_path.endswith('.npy'):
+            _write_atomic(file_path, lambda file: np.save(file, np.ascontiguousarray(self.q_table)))
+        else:
+            raise ValueError(f"A Q-table is saved as .npy or .pkl, got {file_path}")
         print(f"Model saved to {file_path}")
 
     @classmethod
-    def load_model(cls, file_path):
+    def load_model(cls, file_path, mmap=False):
+        """
+        Loads a Q-table saved by save_model. With mmap=True a .npy table is memory-mapped
+        read-only, so several processes can share one on-disk policy (inference only).
+        """
         if not os.path.exists(file_path):
             print(f"Model file not found at {file_path}")
             return None
-        with open(file_path, 'rb') as file:
-            q_table = pickle.load(file)
+        if file_path.endswith('.npz'):
+            q_table = SparseQTable.load(file_path)
+            print(f"Model loaded from {file_path}")
+            agent = cls(q_table.state_size, q_table.action_size, dtype=q_table.dtype, sparse=True)
+            agent.q_table = q_table
+            return agent
+        if file_path.endswith('.pkl'):
+            with open(file_path, 'rb') as file:
+                q_table = pickle.load(file)
+        else:
+            q_table = np.load(file_path, mmap_mode='r' if mmap else None)
         print(f"Model loaded from {file_path}")
         state_size, action_size = q_table.shape
-        agent = cls(state_size, action_size)
+        agent = cls(state_size, action_size, dtype=q_table.dtype)
         agent.q_table = q_table
         return agent
+
+
+class GreedyPolicy:
+    """
+    Deterministic policy exported from a Q-table: the best action (-5..+5) for every state
+    as one int8 array. choose_action is a single array index with no exploration, so it can
+    stand in for RLAgent at inference time.
+    """
+    def __init__(self, actions):
+        self.actions = actions
+
+    @classmethod
+    def from_q_table(cls, q_table):
+        # Ties resolve to the lowest action, as in RLAgent.choose_action
+        return cls((np.argmax(q_table, axis=1) - 5).astype(np.int8))
+
+    @classmethod
+    def from_sparse(cls, q_table):
+        # Unvisited states have all-zero rows, whose argmax is the lowest action
+        actions = np.full(q_table.state_size, -5, dtype=np.int8)
+        visited = len(q_table)
+        actions[q_table.keys[:visited]] = np.argmax(q_table.values[:visited], axis=1) - 5
+        return cls(actions)
+
+    def choose_action(self, state):
+        return int(self.actions[state])
+
+    def choose_actions(self, states):
+        return self.actions[np.asarray(states)].astype(np.int64)
+
+    def save(self, file_path):
+        if not file_path.endswith('.npy'):
+            raise ValueError(f"A policy is saved as .npy, got {file_path}")
+        _write_atomic(file_path, lambda file: np.save(file, self.actions))
+        print(f"Policy saved to {file_path}")
+
+    @classmethod
+    def load(cls, file_path, mmap=False):
+        if not os.path.exists(file_path):
+            print(f"Policy file not found at {file_path}")
+            return None
+        return cls(np.load(file_path, mmap_mode='r' if mmap else None))
@@ -0,0 +1,57 @@
+import unicodedata
+import pandas as pd
+
+def normalize_event_key(event):
+    """
+    Canonical lookup key for an event name or slug: "São Paulo Grand Prix",
+    "São_Paulo_Grand_Prix" and its NFD-decomposed file name all map to the same key.
+    """
+    key = unicodedata.normalize("NFC", str(event)).replace("_", " ").replace("-", " ")
+    return " ".join(key.lower().split())
+
+class ScheduleIndex:
+    """
+    Race schedule indexed once by (season, event key), so joins and lookups by EventName
+    or file/partition slug are dictionary hits instead of boolean scans over the schedule.
+    Accepts one or several seasons of FastF1 schedules (RoundNumber, EventName, EventDate).
+    """
+    def __init__(self, race_schedule):
+        schedule = race_schedule.copy()
+        schedule["EventDate"] = pd.to_datetime(schedule["EventDate"])
+        schedule["Season"] = schedule["EventDate"].dt.year
+        schedule["EventKey"] = schedule["EventName"].map(normalize_event_key)
+        self.schedule = schedule.reset_index(drop=True)
+
+        self._by_season_key = {}
+        self._by_key = {}
+        for row in self.schedule.to_dict("records"):
+            self._by_season_key[(row["Season"], row["EventKey"])] = row
+            self._by_key.setdefault(row["EventKey"], []).append(row)
+
+    @classmethod
+    def from_csv(cls, *schedule_files):
+        return cls(pd.concat([pd.read_csv(file) for file in schedule_files], ignore_index=True))
+
+    @property
+    def seasons(self):
+        return sorted(self.schedule["Season"].unique())
+
+    def races(self, season=None):
+        # Scheduled races only; FastF1 gives testing events RoundNumber 0
+        races = self.schedule[self.schedule["RoundNumber"] != 0]
+        if season is not None:
+            races = races[races["Season"] == season]
+        return races
+
+    def lookup(self, event, season=None):
+        """
+        Schedule row (as a dict) for an event name or slug, or None if it is not scheduled.
+        Without a season the event must be unambiguous across the indexed seasons.
+        """
+        key = normalize_event_key(event)
+        if season is not None:
+            return self._by_season_key.get((int(season), key))
+        rows = self._by_key.get(key, [])
+        if len(rows) > 1:
+            raise ValueError(f"{event} is scheduled in several seasons; pass season")
+        return rows[0] if rows else None
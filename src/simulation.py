@@ -0,0 +1,39 @@
+import pandas as pd
+
+def simulate_rl(env, agent):
+    """
+    Runs one episode with the agent's policy and records inventory, action and reward per day.
+    """
+    state = env.reset()
+    results = []
+    done = False
+
+    while not done:
+        inventory_before = env.current_inve()
+        action = agent.choose_action(state)
+        state, reward, done = env.step(action)
+        inventory_after = env.last_inve()
+        results.append({
+            "Day": env.current_day,
+            "Inventory Before Action": inventory_before,
+            "Inventory After Action": inventory_after,
+            "Action Taken (Inventory Adjustment)": action,
+            "Reward": reward,
+        })
+    return pd.DataFrame(results)
+
+def simulate_policy(env, policy):
+    """
+    simulate_rl for a GreedyPolicy: the whole episode is one vectorized env.rollout call
+    on a precompiled environment, otherwise the per-step loop.
+    """
+    if not env.precompiled:
+        return simulate_rl(env, policy)
+    trajectory = env.rollout(policy.actions)
+    return pd.DataFrame({
+        "Day": trajectory["day"],
+        "Inventory Before Action": trajectory["inventory_before"],
+        "Inventory After Action": trajectory["inventory_after"],
+        "Action Taken (Inventory Adjustment)": trajectory["action"],
+        "Reward": trajectory["reward"],
+    })
@@ -0,0 +1,139 @@
+import sys
+import numpy as np
+
+class SparseQTable:
+    """
+    Hash-backed Q-store for large, sparsely visited state spaces. A dict maps each state
+    key to a row of one growable (rows, action_size) array, so only states that have been
+    written take memory; unvisited states read as zeros without being allocated.
+
+    Supports the indexing RLAgent uses on a dense table: q[state], q[state, action],
+    q[states] and q[states, actions] for reads, and the same forms for assignment
+    (which allocates rows for new states).
+    """
+    def __init__(self, action_size, dtype=np.float64, capacity=1024, state_size=None):
+        self.action_size = action_size
+        self.state_size = state_size  # Size of the key space, informational
+        self.dtype = np.dtype(dtype)
+        self.index = {}  # state key -> row
+        self.keys = np.empty(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, action_size), dtype=dtype)
+
+    # Not a sequence: integer indexing never raises IndexError, so stop numpy and Python
+    # from iterating it or converting it to an array (use to_dense or values instead)
+    __iter__ = None
+
+    def __array__(self, dtype=None, copy=None):
+        raise TypeError("SparseQTable cannot be converted to an array implicitly; use to_dense()")
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def shape(self):
+        return (len(self.index), self.action_size)
+
+    def rows(self, keys, allocate=False):
+        """
+        Row per key; missing keys give -1, or new zeroed rows when allocate is True.
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        rows = np.fromiter((self.index.get(key, -1) for key in keys.ravel().tolist()), dtype=np.int64, count=keys.size)
+        if allocate and (rows < 0).any():
+            for position in np.flatnonzero(rows < 0).tolist():
+                rows[position] = self._allocate(int(keys.flat[position]))
+        return rows.reshape(keys.shape)
+
+    def _allocate(self, key):
+        row = self.index.get(key)
+        if row is not None:  # Repeated new key within one bulk call
+            return row
+        row = len(self.index)
+        if row == len(self.keys):
+            # Grow by doubling; amortized O(1) per new state
+            self.keys = np.concatenate([self.keys, np.empty_like(self.keys)])
+            self.values = np.concatenate([self.values, np.zeros_like(self.values)])
+        self.index[key] = row
+        self.keys[row] = key
+        return row
+
+    def get(self, keys):
+        """
+        Bulk lookup: (len(keys), action_size) Q-values, zeros for unvisited states.
+        """
+        rows = self.rows(keys)
+        return np.where((rows >= 0)[..., None], self.values[np.maximum(rows, 0)], 0).astype(self.dtype, copy=False)
+
+    def update(self, keys, action_idx, deltas):
+        """
+        Bulk update: adds deltas to Q(keys, action_idx); duplicate pairs accumulate.
+        """
+        rows = self.rows(keys, allocate=True)
+        np.add.at(self.values, (rows, np.asarray(action_idx)), deltas)
+
+    def __getitem__(self, item):
+        if isinstance(item, tuple):
+            keys, action_idx = item
+            if np.ndim(keys) == 0:
+                row = self.index.get(int(keys))
+                return self.values[row, action_idx] if row is not None else self.dtype.type(0)
+            return self.get(keys)[np.arange(len(keys)), action_idx]
+        if np.ndim(item) == 0:
+            row = self.index.get(int(item))
+            return self.values[row] if row is not None else np.zeros(self.action_size, dtype=self.dtype)
+        return self.get(item)
+
+    def __setitem__(self, item, value):
+        # Allocate first: growing replaces self.values, so it must be read afterwards
+        if isinstance(item, tuple):
+            keys, action_idx = item
+            rows = self.rows(np.asarray(keys), allocate=True)
+            self.values[rows, action_idx] = value
+        else:
+            rows = self.rows(np.asarray(item), allocate=True)
+            self.values[rows] = value
+
+    def memory_usage(self):
+        """
+        Bytes held by the store and per visited state (values, key array and dict index;
+        unused growth capacity counts too).
+        """
+        index_bytes = sys.getsizeof(self.index) + sum(sys.getsizeof(key) + sys.getsizeof(row) for key, row in self.index.items())
+        total = self.values.nbytes + self.keys.nbytes + index_bytes
+        visited = len(self.index)
+        return {
+            "visited_states": visited,
+            "capacity": len(self.keys),
+            "bytes": total,
+            "bytes_per_state": total / visited if visited else 0.0,
+        }
+
+    def to_dense(self):
+        q_table = np.zeros((self.state_size, self.action_size), dtype=self.dtype)
+        q_table[self.keys[:len(self)]] = self.values[:len(self)]
+        return q_table
+
+    def save(self, file_path):
+        np.savez(file_path, keys=self.keys[:len(self)], values=self.values[:len(self)], state_size=self.state_size or -1)
+
+    @classmethod
+    def load(cls, file_path):
+        with np.load(file_path) as data:
+            keys, values, state_size = data["keys"], data["values"], int(data["state_size"])
+        table = cls(values.shape[1], dtype=values.dtype, capacity=max(len(keys), 1), state_size=None if state_size < 0 else state_size)
+        table.keys[:len(keys)] = keys
+        table.values[:len(keys)] = values
+        table.index = dict(zip(keys.tolist(), range(len(keys))))
+        return table
+
+
+if __name__ == "__main__":
+    # Self-check: fill past the initial capacity through scalar and bulk writes
+    table = SparseQTable(action_size=3, capacity=4)
+    for key in range(10):
+        table[key * 7, 1] = key
+    table[np.arange(100, 120), np.zeros(20, dtype=int)] = np.arange(20)
+    assert len(table) == 30 and len(table.keys) >= 30
+    assert [table[key * 7, 1] for key in range(10)] == list(range(10))
+    assert (table[np.arange(100, 120), np.zeros(20, dtype=int)] == np.arange(20)).all()
+    print(f"SparseQTable self-check passed: {table.memory_usage()}")
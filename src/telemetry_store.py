@@ -0,0 +1,103 @@
+import os
+import glob
+import argparse
+import pandas as pd
+
+# Root of the Parquet telemetry store, partitioned as <kind>/season=<year>/event=<slug>/
+STORE_ROOT = "data/telemetry"
+
+# Column types for FastF1 lap tables
+TIMEDELTA_COLUMNS = [
+    "Time", "LapTime", "PitOutTime", "PitInTime",
+    "Sector1Time", "Sector2Time", "Sector3Time",
+    "Sector1SessionTime", "Sector2SessionTime", "Sector3SessionTime",
+    "LapStartTime",
+]
+DATETIME_COLUMNS = ["LapStartDate"]
+BOOLEAN_COLUMNS = ["IsPersonalBest", "FreshTyre", "Deleted", "FastF1Generated", "IsAccurate"]
+CATEGORICAL_COLUMNS = ["Driver", "Team", "Compound", "TrackStatus", "DeletedReason"]
+
+def event_slug(event_name):
+    return event_name.replace(" ", "_")
+
+def _partition_file(kind, year, event_name, store_root):
+    return os.path.join(store_root, kind, f"season={year}", f"event={event_slug(event_name)}", "part-0.parquet")
+
+def normalize_types(df):
+    """
+    Casts timedelta, datetime, boolean and categorical columns to proper dtypes so they
+    are stored natively instead of as strings.
+    """
+    df = df.copy()
+    for column in TIMEDELTA_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_timedelta(df[column])
+    for column in DATETIME_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column])
+    for column in BOOLEAN_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("boolean")
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("string").astype("category")
+    return df
+
+def write_race_telemetry(year, event_name, laps, pit_stops, store_root=STORE_ROOT):
+    # Writes one race's laps and pit stop counts into their season/event partitions
+    for kind, df in (("laps", laps), ("pitstops", pit_stops)):
+        output_file = _partition_file(kind, year, event_name, store_root)
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        normalize_types(df).to_parquet(output_file, index=False)
+
+def _load(kind, columns, seasons, events, store_root):
+    path = os.path.join(store_root, kind)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No {kind} telemetry in store at {store_root}")
+
+    # Partition filters are pushed down, so unmatched seasons/events are never opened
+    filters = []
+    if seasons is not None:
+        filters.append(("season", "in", [int(season) for season in seasons]))
+    if events is not None:
+        filters.append(("event", "in", [event_slug(event) for event in events]))
+    if columns is not None:
+        columns = list(dict.fromkeys(list(columns) + ["season", "event"]))
+
+    df = pd.read_parquet(path, columns=columns, filters=filters or None)
+    df["season"] = df["season"].astype(int)
+    return df
+
+def load_laps(columns=None, seasons=None, events=None, store_root=STORE_ROOT):
+    """
+    Loads lap telemetry, reading only the requested columns and season/event partitions.
+    The season and event partition columns are always included.
+    """
+    return _load("laps", columns, seasons, events, store_root)
+
+def load_pitstops(columns=None, seasons=None, events=None, store_root=STORE_ROOT):
+    """
+    Loads per-driver pit stop counts, reading only the requested columns and partitions.
+    """
+    return _load("pitstops", columns, seasons, events, store_root)
+
+def import_csv_telemetry(year, csv_folder="data", store_root=STORE_ROOT):
+    # Migrates legacy telemetry_<Race>_laps.csv / _pitstops.csv dumps into the store
+    imported = []
+    for pitstops_file in sorted(glob.glob(os.path.join(csv_folder, "telemetry_*_pitstops.csv"))):
+        slug = os.path.basename(pitstops_file)[len("telemetry_"):-len("_pitstops.csv")]
+        laps_file = pitstops_file.replace("_pitstops.csv", "_laps.csv")
+        laps = pd.read_csv(laps_file) if os.path.exists(laps_file) else pd.DataFrame()
+        write_race_telemetry(year, slug, laps, pd.read_csv(pitstops_file), store_root)
+        imported.append(slug)
+    print(f"Imported {len(imported)} races for {year} into {store_root}")
+    return imported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import CSV telemetry dumps into the Parquet store.")
+    parser.add_argument("--season", type=int, default=2023)
+    parser.add_argument("--csv-folder", default="data")
+    args = parser.parse_args()
+
+    import_csv_telemetry(args.season, args.csv_folder)
@@ -1,18 +1,23 @@
 import sys
 import os
+import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from environment.rl_environment import SupplyChainEnvironment
-from rl_agent import RLAgent
+from rl_agent import GreedyPolicy
+from policy_evaluation import MODEL_FILE, POLICY_FILE, load_policy
 
 import logging
 
 logging.basicConfig(level=logging.INFO)
 
 def test_agent(env, agent):
+    if isinstance(agent, GreedyPolicy) and env.precompiled:
+        return test_policy(env, agent)
+
     state = env.reset()
     total_reward = 0
     done = False
@@ -47,8 +52,24 @@ def test_agent(env, agent):
     logging.info(f"Test Run Complete. Total Reward: {total_reward}")
     return pd.DataFrame(results)
 
+def test_policy(env, policy):
+    # Same output as test_agent, computed with one vectorized rollout
+    trajectory = env.rollout(policy.actions)
+    logging.info(f"Test Run Complete. Total Reward: {trajectory['reward'].sum()}")
+    return pd.DataFrame({
+        "Day": trajectory["day"],
+        "Action Taken (Inventory Adjustment)": trajectory["action"],
+        "Inventory Before": trajectory["inventory_before"],
+        "Inventory After": trajectory["next_inventory"],
+        "Reward": trajectory["reward"],
+    })
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run one test episode with the trained policy.")
+    parser.add_argument("--model", default=MODEL_FILE, help="Trained model to test (.npy Q-table or tile-coding .npz)")
+    args = parser.parse_args()
+
     max_inventory = 500
     max_days = 180
 
@@ -57,14 +78,16 @@ if __name__ == "__main__":
         distances_file="data/constructors_distances.csv",
         max_days=max_days,
         max_inventory=max_inventory,
+        precompiled=True,
     )
 
-    agent = RLAgent.load_model("models/trained_rl_agent.pkl")
-    if not agent:
+    # Exported greedy policy if it is current, otherwise built from the model itself
+    policy = load_policy(args.model, POLICY_FILE if args.model == MODEL_FILE else None, mmap=True)
+    if policy is None:
         logging.error("Trained agent file not found. Please train the agent first.")
         sys.exit(1)
 
-    test_results = test_agent(env, agent)
+    test_results = test_agent(env, policy)
     test_results.to_csv("models/testing_results.csv", index=False)
 
     # # Plot Inventory Changes
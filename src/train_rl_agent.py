@@ -1,51 +1,304 @@
 import sys
 import os
+import json
+import argparse
+import time
+import multiprocessing
+import numpy as np
 import pandas as pd
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from environment.rl_environment import SupplyChainEnvironment
+from environment.rl_environment import SupplyChainEnvironment, BatchSupplyChainEnvironment
+from environment.state_encoding import StateDiscretizer
 from rl_agent import RLAgent
+from linear_agent import TileCodingAgent
+from training_metrics import TrainingMetrics
+from checkpointing import Checkpointer
+from early_stopping import EarlyStopping
+from dyna import DynaPlanner
+from policy_evaluation import MODEL_FILE, POLICY_FILE
 
 import logging
 
 logging.basicConfig(level=logging.INFO)
 
-def train_agent(env, agent, episodes):
+def train_agent(
+    env,
+    agent,
+    episodes,
+    rewards_file="models/training_rewards.csv",
+    metrics=None,
+    log_every=1,
+    checkpointer=None,
+    resume=False,
+    early_stopping=None,
+    planner=None,
+):
+    # metrics: optional TrainingMetrics; only its sampled episodes run the instrumented loop
+    # checkpointer: optional Checkpointer; with resume=True training continues from its latest checkpoint
+    # early_stopping: optional EarlyStopping; ends training before `episodes` once converged
+    # planner: optional DynaPlanner; adds simulated backups from a learned model after every real step
     rewards_log = []
-    for episode in range(episodes):
-        state = env.reset()
+    start_episode = 0
+    if checkpointer is not None and resume and checkpointer.exists():
+        start_episode, rewards_log = checkpointer.restore(env, agent)
+        logging.info(f"Resumed from checkpoint after episode {start_episode}.")
+
+    if early_stopping is not None:
+        early_stopping.start(start_episode)
+
+    for episode in range(start_episode, episodes):
+        if early_stopping is not None:
+            early_stopping.start_episode(agent)
+        if metrics is not None and metrics.should_sample(episode):
+            total_reward = metrics.run_episode(env, agent, episode, planner=planner)
+        else:
+            state = env.reset()
+            total_reward = 0
+            done = False
+
+            while not done:
+                action = agent.choose_action(state)
+                next_state, reward, done = env.step(action)
+                td_error = agent.learn(state, action, reward, next_state)
+                if planner is not None:
+                    planner.update(agent, state, action, reward, next_state, td_error)
+                state = next_state
+                total_reward += reward
+
+        if metrics is not None:
+            metrics.count_episode()
+        rewards_log.append(total_reward)
+        if (episode + 1) % log_every == 0:
+            logging.info(f"Episode {episode+1}/{episodes} - Total Reward: {total_reward}")
+        if checkpointer is not None:
+            checkpointer.maybe_save(env, agent, episode + 1, rewards_log)
+        if early_stopping is not None and early_stopping.update(agent, total_reward):
+            logging.info(f"Stopped early after episode {episode+1}: {early_stopping.reason}.")
+            break
+
+    logging.info("Training completed.")
+    if rewards_file:
+        pd.Series(rewards_log).to_csv(rewards_file, index=False)
+    return agent
+
+def train_agent_batch(env, agent, episodes, rewards_file="models/training_rewards.csv"):
+    # Runs env.num_envs episodes in lockstep per round on a BatchSupplyChainEnvironment
+    rewards_log = []
+    rounds = int(np.ceil(episodes / env.num_envs))
+    for round_index in range(rounds):
+        states = env.reset()
+        total_rewards = np.zeros(env.num_envs)
+        dones = np.zeros(env.num_envs, dtype=bool)
+
+        while not dones.all():
+            active = ~dones
+            actions = agent.choose_actions(states)
+            next_states, rewards, dones = env.step(actions)
+            agent.learn_batch(states[active], actions[active], rewards[active], next_states[active])
+            states = next_states
+            total_rewards += rewards
+
+        rewards_log.extend(total_rewards.tolist())
+        logging.info(f"Round {round_index+1}/{rounds} - Mean Total Reward: {total_rewards.mean():.1f}")
+
+    rewards_log = rewards_log[:episodes]
+    logging.info("Training completed.")
+    if rewards_file:
+        pd.Series(rewards_log).to_csv(rewards_file, index=False)
+    return agent
+
+# Per-process environment for parallel training, built once by the pool initializer
+_worker_env = None
+
+def _init_parallel_worker(env_kwargs):
+    global _worker_env
+    _worker_env = SupplyChainEnvironment(**env_kwargs, precompiled=True)
+
+def _run_parallel_worker(args):
+    # Runs a block of episodes from the shared Q-table snapshot and returns the worker's table
+    q_table, epsilon, episodes, seed = args
+    _worker_env.seed(seed)
+    agent = RLAgent(state_size=q_table.shape[0], action_size=q_table.shape[1], seed=seed, dtype=q_table.dtype)
+    agent.q_table = q_table.copy()
+    agent.epsilon = epsilon
+
+    rewards = []
+    for _ in range(episodes):
+        state = _worker_env.reset()
         total_reward = 0
         done = False
-
         while not done:
             action = agent.choose_action(state)
-            next_state, reward, done = env.step(action)
+            next_state, reward, done = _worker_env.step(action)
             agent.learn(state, action, reward, next_state)
             state = next_state
             total_reward += reward
+        rewards.append(total_reward)
+    return agent.q_table, agent.epsilon, rewards
 
-        rewards_log.append(total_reward)
-        logging.info(f"Episode {episode+1}/{episodes} - Total Reward: {total_reward}")
+def train_agent_parallel(env_kwargs, agent, episodes, num_workers, sync_every=10, seed=0, rewards_file="models/training_rewards.csv"):
+    """
+    Trains with a pool of worker processes, each on its own seeded SupplyChainEnvironment.
+    Every worker runs sync_every episodes from the shared Q-table, then the worker tables
+    are averaged back into agent.q_table before the next round.
+    """
+    rewards_log = []
+    episodes_per_round = num_workers * sync_every
+    rounds = int(np.ceil(episodes / episodes_per_round))
 
-    logging.info("Training completed.")
-    pd.Series(rewards_log).to_csv("models/training_rewards.csv", index=False)
-    return agent
+    start = time.perf_counter()
+    with multiprocessing.Pool(num_workers, initializer=_init_parallel_worker, initargs=(env_kwargs,)) as pool:
+        for round_index in range(rounds):
+            jobs = [
+                (agent.q_table, agent.epsilon, sync_every, seed + round_index * num_workers + worker)
+                for worker in range(num_workers)
+            ]
+            results = pool.map(_run_parallel_worker, jobs)
+
+            # Merge: average the worker tables and continue from the mean epsilon
+            agent.q_table = np.mean([q_table for q_table, _, _ in results], axis=0).astype(agent.q_table.dtype)
+            agent.epsilon = float(np.mean([epsilon for _, epsilon, _ in results]))
+            round_rewards = [reward for _, _, rewards in results for reward in rewards]
+            rewards_log.extend(round_rewards)
+            logging.info(f"Round {round_index+1}/{rounds} - Mean Total Reward: {np.mean(round_rewards):.1f}")
+    elapsed = time.perf_counter() - start
+
+    rewards_log = rewards_log[:episodes]
+    logging.info(f"Training completed with {num_workers} workers: {len(rewards_log) / elapsed:.1f} episodes/sec.")
+    if rewards_file:
+        pd.Series(rewards_log).to_csv(rewards_file, index=False)
+    return agent, len(rewards_log) / elapsed
+
+def report_parallel_scaling(env_kwargs, state_size, action_size, max_workers, episodes_per_worker=20):
+    # Times a fixed amount of work per worker for 1, 2, 4, ... max_workers processes
+    worker_counts = sorted({min(2 ** i, max_workers) for i in range(int(np.log2(max_workers)) + 2)})
+    throughput = {}
+    for num_workers in worker_counts:
+        agent = RLAgent(state_size=state_size, action_size=action_size, dtype=np.float32)
+        _, throughput[num_workers] = train_agent_parallel(
+            env_kwargs, agent, episodes_per_worker * num_workers, num_workers, rewards_file=None
+        )
+
+    for num_workers, episodes_per_sec in throughput.items():
+        logging.info(
+            f"{num_workers:>3} workers: {episodes_per_sec:8.1f} episodes/sec "
+            f"(speedup {episodes_per_sec / throughput[worker_counts[0]]:.2f}x)"
+        )
+    return throughput
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the supply chain RL agent.")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--num-envs", type=int, default=0, help="Train on N vectorized environments at once (0 = single environment)")
+    parser.add_argument("--workers", type=int, default=0, help="Train with N worker processes (0 = single process)")
+    parser.add_argument("--sync-every", type=int, default=10, help="Episodes each worker runs between Q-table merges")
+    parser.add_argument("--scaling", action="store_true", help="Report parallel throughput for 1..--workers processes and exit")
+    parser.add_argument("--log-every", type=int, default=1, help="Log the episode reward every N episodes")
+    parser.add_argument("--metrics-every", type=int, default=0, help="Instrument every N-th episode (0 = off)")
+    parser.add_argument("--metrics-csv", default="models/training_metrics.csv")
+    parser.add_argument("--metrics-prom", default=None, help="Also write Prometheus text-format metrics to this file")
+    parser.add_argument("--checkpoint-every", type=int, default=50, help="Checkpoint every N episodes (0 = off)")
+    parser.add_argument("--checkpoint-dir", default="models/checkpoints")
+    parser.add_argument("--resume", action="store_true", help="Continue from the latest checkpoint in --checkpoint-dir")
+    parser.add_argument("--patience", type=int, default=0, help="Stop after N episodes without convergence progress (0 = off)")
+    parser.add_argument("--reward-window", type=int, default=50, help="Episodes in the moving-average reward")
+    parser.add_argument("--min-delta", type=float, default=0.0, help="Moving-average gain that counts as an improvement")
+    parser.add_argument("--q-delta-tol", type=float, default=None, help="Also stop once the max Q-value change per episode stays below this")
+    parser.add_argument("--summary-file", default="models/training_summary.json")
+    parser.add_argument("--planning-steps", type=int, default=0, help="Dyna planning backups per real step (0 = off)")
+    parser.add_argument("--prioritized", action="store_true", help="Pick planning backups by prioritized sweeping")
+    parser.add_argument(
+        "--rich-state",
+        action="store_true",
+        help="Encode lead time, transport cost, shortage and pit stops too, with a sparse Q-table",
+    )
+    parser.add_argument("--agent", choices=["table", "tile"], default="table", help="Tabular Q-learning or linear tile-coding agent")
+    args = parser.parse_args()
+    if (args.rich_state or args.agent == "tile") and (args.workers > 0 or args.planning_steps > 0):
+        parser.error("--workers and --planning-steps need the dense tabular agent")
+    if args.resume and (args.rich_state or args.agent == "tile" or args.workers > 0 or args.num_envs > 0):
+        parser.error("--resume needs checkpoints, which only the single-environment dense tabular agent writes")
+    if args.rich_state and args.q_delta_tol is not None:
+        parser.error("--q-delta-tol compares dense Q-tables and does not support --rich-state")
+    if args.rich_state and args.agent == "tile":
+        parser.error("the tile-coding agent reads the default day/inventory state encoding")
+
     max_inventory = 500
     max_days = 180
 
-    env = SupplyChainEnvironment(
+    env_kwargs = dict(
         data_file="data/final_processed_data.csv",
         distances_file="data/constructors_distances.csv",
         max_days=max_days,
         max_inventory=max_inventory,
     )
-    state_size = max_days * max_inventory
+    discretizer = StateDiscretizer() if args.rich_state else None
+    if args.num_envs > 0:
+        env = BatchSupplyChainEnvironment(**env_kwargs, num_envs=args.num_envs, discretizer=discretizer)
+    else:
+        env = SupplyChainEnvironment(**env_kwargs, precompiled=True, discretizer=discretizer)
+    state_size = env.state_size  # Only the states encode_state can emit
     action_size = 11  # Actions: -5 to +5
 
-    agent = RLAgent(state_size=state_size, action_size=action_size)
-    trained_agent = train_agent(env, agent, episodes=1000)
-    trained_agent.save_model("models/trained_rl_agent.pkl")
+    if args.scaling:
+        report_parallel_scaling(env_kwargs, state_size, action_size, max(args.workers, 1))
+        sys.exit(0)
+
+    if args.agent == "tile":
+        agent = TileCodingAgent.from_env(env, action_size=action_size, dtype=np.float32)
+    else:
+        agent = RLAgent(state_size=state_size, action_size=action_size, dtype=np.float32, sparse=args.rich_state)
+    if args.workers > 0:
+        trained_agent, _ = train_agent_parallel(env_kwargs, agent, args.episodes, args.workers, sync_every=args.sync_every)
+    elif args.num_envs > 0:
+        trained_agent = train_agent_batch(env, agent, episodes=args.episodes)
+    else:
+        metrics = TrainingMetrics(sample_every=args.metrics_every) if args.metrics_every > 0 else None
+        # Checkpoints memory-map the dense table
+        checkpointer = None if args.rich_state or args.agent == "tile" else Checkpointer(args.checkpoint_dir, args.checkpoint_every)
+        early_stopping = None
+        if args.patience > 0:
+            early_stopping = EarlyStopping(args.reward_window, args.patience, args.min_delta, args.q_delta_tol)
+        planner = None
+        if args.planning_steps > 0:
+            planner = DynaPlanner(state_size, action_size, args.planning_steps, prioritized=args.prioritized)
+        trained_agent = train_agent(
+            env,
+            agent,
+            episodes=args.episodes,
+            metrics=metrics,
+            log_every=args.log_every,
+            checkpointer=checkpointer,
+            resume=args.resume,
+            early_stopping=early_stopping,
+            planner=planner,
+        )
+        if early_stopping is not None:
+            with open(args.summary_file, "w") as file:
+                json.dump(early_stopping.summary(), file, indent=2)
+        if metrics is not None:
+            metrics.to_csv(args.metrics_csv)
+            if args.metrics_prom:
+                metrics.to_prometheus(args.metrics_prom)
+    if args.agent == "tile" or args.rich_state:
+        # The exported policy belongs to the dense model; drop it so no script mistakes it
+        # for the policy of this run
+        if os.path.exists(POLICY_FILE):
+            os.remove(POLICY_FILE)
+    if args.agent == "tile":
+        trained_agent.save_model("models/trained_tile_agent.npz")
+        logging.info("Evaluate it with: python src/policy_evaluation.py --model models/trained_tile_agent.npz")
+        logging.info(f"Tile-coding weights: {trained_agent.weights.nbytes / 1024:.1f} KiB")
+    elif args.rich_state:
+        trained_agent.save_model("models/trained_rl_agent_sparse.npz")
+        memory = trained_agent.q_table.memory_usage()
+        logging.info(
+            f"Sparse Q-table: {memory['visited_states']} of {state_size} states visited, "
+            f"{memory['bytes'] / 1024:.1f} KiB ({memory['bytes_per_state']:.0f} bytes per visited state)"
+        )
+    else:
+        trained_agent.save_model(MODEL_FILE)
+        trained_agent.greedy_policy().save(POLICY_FILE)
@@ -0,0 +1,126 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+
+def _q_coverage(agent):
+    # Fraction of states with any non-zero Q-value; for a sparse table, visited states;
+    # for a tile-coding agent, tiles with non-zero weights
+    if not hasattr(agent, "q_table"):
+        return np.count_nonzero(np.any(agent.weights != 0, axis=1)) / agent.weights.shape[0]
+    if isinstance(agent.q_table, np.ndarray):
+        return np.count_nonzero(np.any(agent.q_table != 0, axis=1)) / agent.q_table.shape[0]
+    return len(agent.q_table) / agent.state_size
+
+class TrainingMetrics:
+    """
+    Per-episode training instrumentation. Every sample_every-th episode is run through an
+    instrumented loop that records env step time, learn time, epsilon, TD-error statistics
+    and Q-table coverage; other episodes take the plain loop and cost nothing extra.
+    Each record is passed to the registered callbacks and kept for CSV / Prometheus export.
+    """
+    def __init__(self, sample_every=1, callbacks=()):
+        self.sample_every = max(int(sample_every), 1)
+        self.callbacks = list(callbacks)
+        self.records = []
+        self.counters = {"episodes": 0, "sampled_episodes": 0, "steps": 0, "step_seconds": 0.0, "learn_seconds": 0.0}
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def should_sample(self, episode):
+        return episode % self.sample_every == 0
+
+    def run_episode(self, env, agent, episode, planner=None):
+        """
+        Instrumented version of the train_agent episode loop. Returns the total reward.
+        Planning backups, if any, count as learn time.
+        """
+        episode_start = time.perf_counter()
+        step_seconds = 0.0
+        learn_seconds = 0.0
+        td_errors = []
+        total_reward = 0
+
+        state = env.reset()
+        done = False
+        while not done:
+            action = agent.choose_action(state)
+            start = time.perf_counter()
+            next_state, reward, done = env.step(action)
+            step_end = time.perf_counter()
+            td_error = agent.learn(state, action, reward, next_state)
+            if planner is not None:
+                planner.update(agent, state, action, reward, next_state, td_error)
+            td_errors.append(td_error)
+            learn_seconds += time.perf_counter() - step_end
+            step_seconds += step_end - start
+            state = next_state
+            total_reward += reward
+
+        td_errors = np.asarray(td_errors, dtype=float)
+        self.record({
+            "episode": episode + 1,
+            "steps": len(td_errors),
+            "total_reward": total_reward,
+            "episode_seconds": time.perf_counter() - episode_start,
+            "step_seconds": step_seconds,
+            "learn_seconds": learn_seconds,
+            "epsilon": agent.epsilon,
+            "td_error_mean": td_errors.mean(),
+            "td_error_abs_mean": np.abs(td_errors).mean(),
+            "td_error_abs_max": np.abs(td_errors).max(),
+            "td_error_std": td_errors.std(),
+            "q_coverage": _q_coverage(agent),
+        })
+        return total_reward
+
+    def count_episode(self):
+        # Every trained episode, sampled or not; sampled ones are also counted by record()
+        self.counters["episodes"] += 1
+
+    def record(self, record):
+        self.records.append(record)
+        self.counters["sampled_episodes"] += 1
+        self.counters["steps"] += record["steps"]
+        self.counters["step_seconds"] += record["step_seconds"]
+        self.counters["learn_seconds"] += record["learn_seconds"]
+        for callback in self.callbacks:
+            callback(record)
+
+    def to_frame(self):
+        return pd.DataFrame(self.records)
+
+    def to_csv(self, file_path):
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        self.to_frame().to_csv(file_path, index=False)
+
+    def to_prometheus(self, file_path, prefix="rl_training"):
+        """
+        Writes counters and the latest sampled episode as a Prometheus text-format file
+        (e.g. for the node_exporter textfile collector).
+        """
+        lines = []
+
+        def metric(name, kind, value, help_text):
+            lines.extend([
+                f"# HELP {prefix}_{name} {help_text}",
+                f"# TYPE {prefix}_{name} {kind}",
+                f"{prefix}_{name} {float(value)}",
+            ])
+
+        metric("episodes_total", "counter", self.counters["episodes"], "Episodes trained.")
+        metric("sampled_episodes_total", "counter", self.counters["sampled_episodes"], "Episodes instrumented.")
+        metric("sampled_steps_total", "counter", self.counters["steps"], "Environment steps in instrumented episodes.")
+        metric("step_seconds_total", "counter", self.counters["step_seconds"], "Time in env.step during instrumented episodes.")
+        metric("learn_seconds_total", "counter", self.counters["learn_seconds"], "Time in agent.learn during instrumented episodes.")
+        if self.records:
+            last = self.records[-1]
+            for name in ("total_reward", "epsilon", "td_error_abs_mean", "td_error_abs_max", "q_coverage"):
+                metric(name, "gauge", last[name], f"{name} of the latest instrumented episode.")
+
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        tmp_file = f"{file_path}.tmp"
+        with open(tmp_file, "w") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(tmp_file, file_path)